@@ -1,6 +1,10 @@
 import pygame, sys, math
 from os.path import join
 from random import randint
+from graphs import graph_cache
+from planner import Planner
+from scheduler import PathScheduler
+from workers import PathWorker
 
 # Initialize 
 pygame.init()
@@ -17,12 +21,7 @@ class Nodes():
         self.y = y
         self.color = 'white'
         self.rect = pygame.Rect(self.x,self.y,self.width,self.height)
-
-        # Path Finding Attribute
-        self.parent = None
-        self.g = float('inf')  # Cost from start to this node
-        self.h = 0  # Heuristic (estimated cost from this node to the end)
-        self.f = float('inf')  # Total cost (g + h)
+        self.center = self.rect.center  # Position used by the graph builder and the A* heuristic
     
     def render(self):
         pygame.draw.rect(display,self.color,self.rect,0)
@@ -73,130 +72,83 @@ def render_nodes(rows, cols):
 
 def build_graph(nodes):
     """
-    Builds a graph where each node is connected to its three closest neighbors.
-
-    Args:
-        nodes (list): A list of Nodes.
-
-    Returns:
-        dict: A dictionary where each node is mapped to a list of its closest neighbors.
-    """
-    graph = {}  # Dictionary to store node connections
-
-    # Iterate through each node in the list
-    for node in nodes:
-        list_nodes = []  # List to store neighboring nodes with their distances
-
-        # Compare the current node with every other node
-        for other_node in nodes:
-            if node != other_node:  # Avoid calculating distance to itself
-                distance = node.calculate_distance(other_node)  # Compute Euclidean distance
-                list_nodes.append((other_node, distance))  # Store node with its distance
-        
-        # Sort neighbors by distance (ascending order)
-        list_nodes.sort(key=lambda x: x[1])
+    Builds a graph where each node is connected to its five closest neighbors.
 
-        # Select the 3 closest neighbors
-        closest_nodes = list_nodes[:5]
-
-        # Store the closest neighbors in the graph dictionary
-        graph[node] = closest_nodes
-
-    return graph  # Return the complete graph
-
-def a_star(start_node, end_node, graph):
-    """
-    Implements A* pathfinding algorithm.
+    The neighbors come from a spatial hash grid (see graphs.build_knn_graph),
+    and the result is cached, so asking again for the same node layout is free.
 
     Args:
-        start_node (Nodes): The starting node.
-        end_node (Nodes): The goal node.
-        graph (dict): A dictionary of nodes with their neighbors.
+        nodes (list): A list of Nodes.
 
     Returns:
-        list: The shortest path from start to end.
+        Graph: A dictionary where each node is mapped to a list of its closest neighbors.
     """
-    open_set = []  # Nodes to be evaluated
-    closed_set = set()  # Nodes already evaluated
-
-    start_node.g = 0
-    start_node.h = start_node.calculate_distance(end_node)
-    start_node.f = start_node.g + start_node.h
-    open_set.append(start_node)
-
-    while open_set:
-        # Get node with lowest F value
-        open_set.sort(key=lambda node: node.f)
-        current_node = open_set.pop(0)
-        closed_set.add(current_node)
-
-        # If reached the goal, reconstruct the path
-        if current_node == end_node:
-            path = []
-            while current_node:
-                path.append(current_node)
-                current_node = current_node.parent
-            return path[::-1]  # Return reversed path
-
-        for neighbor, _ in graph[current_node]:  # Loop through neighbors
-            if neighbor in closed_set:
-                continue  # Skip if already evaluated
-
-            temp_g = current_node.g + current_node.calculate_distance(neighbor)
-
-            if temp_g < neighbor.g:
-                neighbor.parent = current_node
-                neighbor.g = temp_g
-                neighbor.h = neighbor.calculate_distance(end_node)
-                neighbor.f = neighbor.g + neighbor.h
-
-                if neighbor not in open_set:
-                    open_set.append(neighbor)
-
-    return None  # No path found
+    return graph_cache.get(nodes, k=5)
 
 def regenerate_path():
-    global nodes, start_point, end_point, path_locations, counter
-    nodes = render_nodes(GRID_ROW, GRID_COL)
+    global search_job, search_query
+    # The node layout never changes, so the nodes and their cached graph are reused
     graph = build_graph(nodes)
     
-    # New start and end points
-    start_point = nodes[randint(0, len(nodes)-1)].rect.center
-    end_point = nodes[randint(0, len(nodes)-1)].rect.center
+    # The next path starts where the current one ends, so the player walks on without jumping
+    next_end_point = nodes[randint(0, len(nodes)-1)].rect.center
     
     # Find corresponding nodes
     start_node = None
     end_node = None
 
     for node in nodes:
-        if node.rect.center == start_point:
-            start_node = node
         if node.rect.center == end_point:
+            start_node = node
+        if node.rect.center == next_end_point:
             end_node = node
 
-    # Run A* to find the path
-    paths = a_star(start_node, end_node, graph)
-
-    # Reset path locations and counter
-    path_locations = [node.rect.center for node in paths]
-    counter = 0  # Reset counter to start from the new start point
+    # The all-pairs table (or the path cache on bigger graphs) answers right away
+    found, paths = planner.lookup(start_node, end_node, graph)
+    if found:
+        path_found(paths)
+        return
+
+    # Otherwise start a search, the player keeps following the current path until it is done
+    search_query = (start_node, end_node, graph.version)
+    if SEARCH_MODE == 'worker':
+        search_job = worker.submit(start_node, end_node, graph)
+    else:
+        search_job = scheduler.submit(start_node, end_node, graph)
+
+def path_found(paths):
+    global next_path
+    # Keep the path until the current one is walked to the end
+    next_path = [node.rect.center for node in paths] if paths else None
+
+def search_finished(result):
+    global search_job
+    # Cache the path for the graph version it was searched on, then hand it over
+    planner.store(*search_query, result.path)
+    search_job = None
+    print(f"Path found: {result.expanded} nodes expanded in {result.elapsed * 1000:.2f} ms")
+    path_found(result.path)
+
+def follow_next_path():
+    global start_point, end_point, path_locations, counter, next_path
+    # Switch to the waiting path and start looking for the one after it
+    path_locations = next_path
+    start_point, end_point = path_locations[0], path_locations[-1]
+    counter = 1  # The player already stands on the first location
+    next_path = None
+    regenerate_path()
 
-    # Render the nodes with updated colors
-    for node in nodes:
-        if node.rect.center == start_point:
-            node.color = 'blue'
-        elif node.rect.center == end_point:
-            node.color = 'red'
-        elif node in paths:
-            node.color = 'green'
-        else:
-            node.color = 'white'
-        node.render()
-        
 # Variables
 GRID_ROW, GRID_COL = 5, 7
 nodes = render_nodes(GRID_ROW, GRID_COL)
 graph = build_graph(nodes)
+planner = Planner()  # All-pairs table below ALL_PAIRS_MAX_NODES nodes, cached A* above
+SEARCH_MODE = 'worker'  # Paths the planner can't answer: 'worker' (background thread) or 'sliced' (a few expansions per frame)
+worker = PathWorker()  # One background thread searching a snapshot of the graph, on graphs without a table
+scheduler = PathScheduler(max_expansions=50)  # Node expansions per frame, so a long search never stalls one
+search_job = None  # Search still running, a PathRequest ('worker') or a SearchJob ('sliced')
+search_query = None  # (start, end, graph version) of that search
+next_path = None  # Locations of the path found for after the current one
 clock = pygame.time.Clock()
 start_point = nodes[randint(0, len(nodes)-1)].rect.center
 end_point = nodes[randint(0, len(nodes)-1)].rect.center
@@ -220,11 +172,14 @@ for node in nodes:
     if node.rect.center == end_point:
         end_node = node
 
-paths = a_star(start_node, end_node, graph)
+paths = planner.path(start_node, end_node, graph)
 
 for path in paths:
     path_locations.append(path.rect.center)
 
+# Look for the next path while the player walks this one
+regenerate_path()
+
 
 # Event
 move_event = pygame.event.custom_type()
@@ -243,8 +198,16 @@ while running:
                 player.rect.center = path_locations[counter]
                 counter += 1
                 print(f"Player moving to: {player.rect.center}") 
-            else:
-                regenerate_path()
+            elif next_path is not None:
+                follow_next_path()
+            elif search_job is None:
+                regenerate_path()  # The last search found no path, try another end point
+
+    # Advance the queued search a little, then collect the search once it is done
+    if SEARCH_MODE == 'sliced':
+        scheduler.update()
+    if search_job is not None and search_job.done():
+        search_finished(search_job.result())
 
     display.fill('black')
 
@@ -270,4 +233,5 @@ while running:
 
     pygame.display.flip()
 
+worker.shutdown()
 pygame.quit()
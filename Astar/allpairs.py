@@ -0,0 +1,137 @@
+import heapq
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+# ==============================
+# ALL-PAIRS NEXT HOPS
+# ==============================
+# On small graphs every path can be worked out once up front. A Dijkstra
+# run backwards from a target over the reversed edges gives the shortest-
+# path tree into that target: for every other node, the neighbor to step
+# to next. With one tree per target, any path is read off the tables in
+# O(path length), and because each path follows a single tree it can
+# never loop, even when several routes tie.
+#
+# Trees are independent, so a table can be built on a process pool when
+# asked for with `workers`. It is built serially by default: the demos are
+# top-level pygame scripts, and where processes are spawned (Windows,
+# macOS) every worker would start the script over. Like Pacman's batch.py,
+# a script that asks for workers must keep its own top-level code under
+# `if __name__ == "__main__":`.
+
+def index_graph(graph):
+    """
+    Numbers the nodes of a graph and reverses its edges.
+
+    Args:
+        graph (dict): A dictionary of nodes with their (neighbor, distance) pairs.
+
+    Returns:
+        tuple: (nodes, index, reverse) where nodes is a list, index maps each node
+               to its position and reverse[i] lists the (j, distance) edges j -> i.
+    """
+    nodes = list(graph)
+    index = {node: i for i, node in enumerate(nodes)}
+    reverse = [[] for _ in nodes]
+    for node, edges in graph.items():
+        for neighbor, dist in edges:
+            reverse[index[neighbor]].append((index[node], dist))
+    return nodes, index, reverse
+
+def reverse_dijkstra(target, reverse, sources=None):
+    """
+    Shortest-path tree into one target.
+
+    Args:
+        target (int): Index of the target node.
+        reverse (list): Reversed adjacency lists from index_graph.
+        sources (iterable): Node indexes that need a way to target, the search stops once
+                            all of them are settled. Every node when None.
+
+    Returns:
+        tuple: (hops, dists) where hops[i] is the next node on the way from i
+               to target (-1 if target can't be reached, target for itself)
+               and dists[i] the length of that way. With sources, only the
+               hops on the sources' ways are final.
+    """
+    hops = array('i', [-1]) * len(reverse)
+    dists = [float('inf')] * len(reverse)
+    hops[target] = target
+    dists[target] = 0
+    open_set = [(0, target)]
+    waiting = set(sources) if sources is not None else None  # Sources not settled yet
+
+    while open_set:
+        dist, node = heapq.heappop(open_set)
+        if dist > dists[node]:
+            continue  # Stale entry left behind by a better push
+        if waiting is not None:
+            waiting.discard(node)
+            if not waiting:
+                break  # Every source has its final hop
+        for previous, edge in reverse[node]:
+            tentative = dist + edge
+            if tentative < dists[previous]:
+                dists[previous] = tentative
+                hops[previous] = node
+                heapq.heappush(open_set, (tentative, previous))
+
+    return hops, dists
+
+def walk_hops(hops, start, target):
+    """Node indexes from start to target along a tree from reverse_dijkstra, None if unreachable."""
+    if hops[start] < 0:
+        return None
+    path = [start]
+    node = start
+    while node != target:
+        node = hops[node]
+        path.append(node)
+    return path
+
+# Worker side of the process pool: the reversed graph is sent once per worker
+_worker_reverse = None
+
+def _init_worker(reverse):
+    global _worker_reverse
+    _worker_reverse = reverse
+
+def _worker_hops(target):
+    return reverse_dijkstra(target, _worker_reverse)[0].tobytes()
+
+class NextHopTable():
+    """Next hop from every node towards every other node of one graph version."""
+    def __init__(self, graph, workers=None):
+        """
+        Args:
+            graph (dict): The graph to precompute, a Graph if is_current should work.
+            workers (int): Processes to build with, serially in this process when None.
+        """
+        self.version = getattr(graph, 'version', None)
+        self.nodes, self.index, reverse = index_graph(graph)
+        count = len(self.nodes)
+
+        if workers is not None and workers > 1:
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(reverse,)) as pool:
+                rows = pool.map(_worker_hops, range(count), chunksize=max(1, count // (workers * 4)))
+                self.toward = []
+                for row in rows:
+                    self.toward.append(array('i'))
+                    self.toward[-1].frombytes(row)
+        else:
+            self.toward = [reverse_dijkstra(target, reverse)[0] for target in range(count)]  # toward[target][node]
+
+    def is_current(self, graph):
+        """True while the graph is still the version this table was built from."""
+        return self.version is not None and getattr(graph, 'version', None) == self.version
+
+    def path(self, start, end):
+        """
+        Shortest path read off the tables.
+
+        Returns:
+            list: The nodes from start to end, or None if there is no path.
+        """
+        target = self.index[end]
+        path = walk_hops(self.toward[target], self.index[start], target)
+        return [self.nodes[node] for node in path] if path is not None else None
@@ -0,0 +1,110 @@
+import argparse, math, random, time
+from queue import PriorityQueue
+from graphs import build_knn_graph, build_knn_graph_numpy, np
+from search import a_star
+from planner import Planner
+from generators import scatter_nodes
+
+# ==============================
+# A* BENCHMARK
+# ==============================
+# Compares the original PriorityQueue A* from A-Star.py with the heap-based
+# search.a_star on a large random graph, then a crowd of agents re-pathing
+# one A* at a time against Planner.paths. Run from the Astar folder:
+#   python benchmark.py --nodes 10000 --queries 20 --agents 256 --goals 8
+
+def calculate_distance(node, other_node):
+    dx = other_node.center[0] - node.center[0]
+    dy = other_node.center[1] - node.center[1]
+    return math.sqrt(dx ** 2 + dy ** 2)
+
+def priority_queue_a_star(start, end, graph):
+    """The original A-Star.py search: a locked PriorityQueue and an O(n) open-set scan per relaxation."""
+    open_set = PriorityQueue()
+    open_set.put((0, id(start), start))  # id() keeps equal priorities from comparing nodes
+    g_scores = {node: float('inf') for node in graph}
+    f_scores = {node: float('inf') for node in graph}
+    parents = {node: None for node in graph}
+    g_scores[start] = 0
+    f_scores[start] = calculate_distance(start, end)
+
+    while not open_set.empty():
+        current = open_set.get()[2]
+        if current == end:
+            path = []
+            while current:
+                path.append(current)
+                current = parents[current]
+            return path[::-1]
+
+        for neighbor, distance in graph[current]:
+            tentative_g_score = g_scores[current] + distance
+            if tentative_g_score < g_scores[neighbor]:
+                parents[neighbor] = current
+                g_scores[neighbor] = tentative_g_score
+                f_scores[neighbor] = tentative_g_score + calculate_distance(neighbor, end)
+                if neighbor not in [node[2] for node in open_set.queue]:
+                    open_set.put((f_scores[neighbor], id(neighbor), neighbor))
+    return None
+
+def path_cost(path):
+    return sum(calculate_distance(a, b) for a, b in zip(path, path[1:])) if path else None
+
+def timed_queries(search, queries, graph):
+    start = time.perf_counter()
+    paths = [search(start_node, end_node, graph) for start_node, end_node in queries]
+    return time.perf_counter() - start, paths
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="A* benchmark")
+    parser.add_argument("--nodes", type=int, default=10000)
+    parser.add_argument("--neighbors", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--agents", type=int, default=256)
+    parser.add_argument("--goals", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    nodes = scatter_nodes(args.nodes, args.seed)
+    build_start = time.perf_counter()
+    graph = build_knn_graph(nodes, args.neighbors)
+    print(f'{args.nodes} nodes, k={args.neighbors}: graph built in {time.perf_counter() - build_start:.2f} s')
+    if np is not None:
+        build_start = time.perf_counter()
+        assert build_knn_graph_numpy(nodes, args.neighbors) == graph
+        print(f'  with NumPy: {time.perf_counter() - build_start:.2f} s (same graph)')
+
+    rng = random.Random(args.seed + 1)
+    queries = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(args.queries)]
+
+    old_time, old_paths = timed_queries(priority_queue_a_star, queries, graph)
+    new_time, new_paths = timed_queries(a_star, queries, graph)
+
+    # The old search never re-prioritizes a node already in the queue, so its
+    # paths can come out longer; the heap search must never be the longer one
+    shorter = 0
+    for old_path, new_path in zip(old_paths, new_paths):
+        old_cost, new_cost = path_cost(old_path), path_cost(new_path)
+        assert (old_cost is None) == (new_cost is None)
+        if old_cost is not None:
+            assert new_cost <= old_cost + 1e-9
+            shorter += new_cost < old_cost - 1e-9
+
+    found = sum(path is not None for path in new_paths)
+    print(f'{args.queries} queries ({found} reachable, {shorter} shorter than the PriorityQueue path)')
+    print(f'  PriorityQueue A* : {old_time / args.queries * 1000:9.2f} ms / query')
+    print(f'  heap A*          : {new_time / args.queries * 1000:9.2f} ms / query ({old_time / new_time:.0f}x faster)')
+
+    # A crowd of agents heading for a few shared goals
+    goals = [rng.choice(nodes) for _ in range(args.goals)]
+    crowd = [(rng.choice(nodes), goals[agent % args.goals]) for agent in range(args.agents)]
+    single_time, single_paths = timed_queries(a_star, crowd, graph)
+    batch_start = time.perf_counter()
+    batch_paths = Planner().paths(crowd, graph)
+    batch_time = time.perf_counter() - batch_start
+    for old_path, new_path in zip(single_paths, batch_paths):
+        old_cost, new_cost = path_cost(old_path), path_cost(new_path)
+        assert (old_cost is None) == (new_cost is None) and (old_cost is None or math.isclose(old_cost, new_cost))
+    print(f'{args.agents} agents, {args.goals} goals')
+    print(f'  one A* each      : {single_time * 1000:9.2f} ms')
+    print(f'  Planner.paths    : {batch_time * 1000:9.2f} ms ({single_time / batch_time:.1f}x faster)')
@@ -0,0 +1,95 @@
+import math, random
+from graphs import Graph, build_fastest
+from gridpath import GridMap
+
+# ==============================
+# SEEDED GRAPH GENERATORS
+# ==============================
+# Reproducible stand-ins for the demos' graphs at any size, used by the
+# benchmarks. The same seed always gives the same nodes, edges and order.
+#   scatter - random points like A-Star.py's, joined to their 5 closest
+#             (A-Star.py's 3 leaves big scatters in disconnected pieces)
+#   lattice - a uniform grid joined to its 5 closest, like Pathfinding.py
+#   maze    - a maze of open tiles, as a 4-connected Graph and as a GridMap
+
+class Point():
+    """Bare graph node, no pygame needed."""
+    __slots__ = ('center',)
+
+    def __init__(self, x, y):
+        self.center = (x, y)
+
+def scatter_nodes(count, seed=0):
+    """Random nodes spread like A-Star.py's, on an area that keeps the density readable."""
+    rng = random.Random(seed)
+    side = int(math.sqrt(count) * 40)
+    return [Point(rng.randint(0, side), rng.randint(0, side)) for _ in range(count)]
+
+def lattice_nodes(count, spacing=40):
+    """Nodes on a uniform grid like render_nodes, as close to square as count allows."""
+    cols = max(1, round(math.sqrt(count)))
+    rows = max(1, math.ceil(count / cols))
+    return [Point(col * spacing, row * spacing) for row in range(1, rows + 1) for col in range(1, cols + 1)][:count]
+
+def scatter_graph(count, seed=0):
+    return build_fastest(scatter_nodes(count, seed), 5)
+
+def lattice_graph(count, seed=0):
+    return build_fastest(lattice_nodes(count), 5)
+
+def maze_grid(count, seed=0, loops=0.1):
+    """
+    A maze with about count open tiles.
+
+    Carved with a seeded depth-first search, then a share of the remaining
+    inner walls is knocked out so there is more than one way around.
+
+    Returns:
+        GridMap: 0 = open, 1 = wall.
+    """
+    rng = random.Random(seed)
+    rooms = max(1, round(math.sqrt(count / 2)))  # Rooms per side, each room and its doorway make 2 tiles
+    size = rooms * 2 + 1
+    cells = bytearray([1]) * (size * size)
+
+    # Depth-first carve from the top-left room
+    stack = [(0, 0)]
+    seen = {(0, 0)}
+    cells[size + 1] = 0
+    while stack:
+        row, col = stack[-1]
+        options = [(row + dr, col + dc) for dr, dc in ((-1, 0), (0, 1), (1, 0), (0, -1))
+                   if 0 <= row + dr < rooms and 0 <= col + dc < rooms and (row + dr, col + dc) not in seen]
+        if not options:
+            stack.pop()
+            continue
+        next_row, next_col = rng.choice(options)
+        cells[(row + next_row + 1) * size + col + next_col + 1] = 0  # Doorway between the two rooms
+        cells[(next_row * 2 + 1) * size + next_col * 2 + 1] = 0
+        seen.add((next_row, next_col))
+        stack.append((next_row, next_col))
+
+    # Extra openings between rooms
+    for row in range(1, size - 1):
+        for col in range(1, size - 1):
+            if cells[row * size + col] and (row % 2) != (col % 2) and rng.random() < loops:
+                cells[row * size + col] = 0
+    return GridMap(size, size, cells)
+
+def grid_graph(grid):
+    """The open tiles of a GridMap as a 4-connected Graph of Points centered on (col, row)."""
+    points = {(row, col): Point(col, row) for row in range(grid.rows) for col in range(grid.cols) if grid.is_open(row, col)}
+    graph = Graph()
+    for (row, col), point in points.items():
+        graph[point] = [(points[cell], 1) for cell in ((row - 1, col), (row, col + 1), (row + 1, col), (row, col - 1))
+                        if cell in points]
+    return graph
+
+def maze_graph(count, seed=0):
+    return grid_graph(maze_grid(count, seed))
+
+GENERATORS = {
+    'scatter': scatter_graph,
+    'lattice': lattice_graph,
+    'maze': maze_graph,
+}
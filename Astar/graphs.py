@@ -0,0 +1,274 @@
+import math
+from itertools import count
+
+try:
+    import numpy as np  # Optional, only needed by build_knn_graph_numpy
+except ImportError:
+    np = None
+
+# ==============================
+# GRAPH BUILDING
+# ==============================
+# Graph nodes are any hashable objects with a `center` (x, y) attribute.
+# Graphs are dictionaries mapping every node to a list of
+# (neighbor, distance) pairs sorted from closest to farthest.
+
+_versions = count(1)  # Shared by every Graph, so no two graph states ever get the same version
+
+class Graph(dict):
+    """
+    Graph dictionary that takes a new version whenever its edges change.
+
+    Setting, removing or replacing a node's edge list bumps the version, and
+    so do add_edge and remove_edge. Edits made in place on an edge list are
+    invisible to the dictionary, so call touch() after those.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = next(_versions)
+
+    def touch(self):
+        """Marks the edges as changed."""
+        self.version = next(_versions)
+
+    def __setitem__(self, node, edges):
+        super().__setitem__(node, edges)
+        self.touch()
+
+    def __delitem__(self, node):
+        super().__delitem__(node)
+        self.touch()
+
+    def __ior__(self, other):
+        super().__ior__(other)
+        self.touch()
+        return self
+
+    def pop(self, *args):
+        edges = super().pop(*args)
+        self.touch()
+        return edges
+
+    def popitem(self):
+        item = super().popitem()
+        self.touch()
+        return item
+
+    def setdefault(self, node, edges=None):
+        if node not in self:
+            self[node] = edges
+        return self[node]
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.touch()
+
+    def clear(self):
+        super().clear()
+        self.touch()
+
+    def add_edge(self, node, neighbor, dist=None):
+        """Adds (or re-weights) the edge node -> neighbor, keeping the list sorted closest first."""
+        dist = distance(node, neighbor) if dist is None else dist
+        edges = [edge for edge in self.get(node, []) if edge[0] is not neighbor]
+        edges.append((neighbor, dist))
+        edges.sort(key=lambda edge: edge[1])
+        self[node] = edges
+
+    def remove_edge(self, node, neighbor):
+        """Removes the edge node -> neighbor if there is one."""
+        self[node] = [edge for edge in self.get(node, []) if edge[0] is not neighbor]
+
+def distance(node, other_node):
+    """Euclidean distance between the centers of two nodes."""
+    dx = other_node.center[0] - node.center[0]
+    dy = other_node.center[1] - node.center[1]
+    return math.sqrt(dx * dx + dy * dy)
+
+def build_knn_graph(nodes, k=5, cell_size=None):
+    """
+    Connects every node to its k closest nodes using a spatial hash grid.
+
+    Nodes are bucketed into square cells, and each node only measures the
+    nodes in the rings of cells around its own, stopping once no closer
+    node can exist further out. That is about O(n log n) for evenly spread
+    nodes instead of the O(n² log n) of comparing every pair.
+
+    Args:
+        nodes (list): Nodes with a `center` attribute.
+        k (int): Number of neighbors per node.
+        cell_size (float): Side of a grid cell, picked from the node density when None.
+
+    Returns:
+        Graph: Each node mapped to its k closest (neighbor, distance) pairs, closest first.
+               Ties are broken by position in `nodes`, like a stable sort would.
+    """
+    graph = Graph()
+    if not nodes:
+        return graph
+
+    centers = [node.center for node in nodes]
+    min_x = min(x for x, y in centers)
+    min_y = min(y for x, y in centers)
+    max_x = max(x for x, y in centers)
+    max_y = max(y for x, y in centers)
+
+    # Aim for roughly k nodes per cell
+    if cell_size is None:
+        area = max(max_x - min_x, 1) * max(max_y - min_y, 1)
+        cell_size = max(math.sqrt(area * k / len(nodes)), 1)
+
+    # Bucket node indexes by cell
+    cells = {}
+    for index, (x, y) in enumerate(centers):
+        cells.setdefault((int((x - min_x) // cell_size), int((y - min_y) // cell_size)), []).append(index)
+    max_ring = max(int((max_x - min_x) // cell_size), int((max_y - min_y) // cell_size)) + 1
+
+    for index, (x, y) in enumerate(centers):
+        cell_x, cell_y = int((x - min_x) // cell_size), int((y - min_y) // cell_size)
+        candidates = []  # (distance, index) of every node measured so far
+
+        for ring in range(max_ring + 1):
+            # Cells on the square ring at Chebyshev distance `ring` from the node's cell
+            for dx in range(-ring, ring + 1):
+                for dy in range(-ring, ring + 1):
+                    if max(abs(dx), abs(dy)) != ring:
+                        continue
+                    for other in cells.get((cell_x + dx, cell_y + dy), ()):
+                        if other != index:
+                            ox, oy = centers[other]
+                            candidates.append((math.sqrt((ox - x) * (ox - x) + (oy - y) * (oy - y)), other))
+
+            # Anything in the next ring is at least `ring` cells away
+            if len(candidates) >= k:
+                candidates.sort()
+                if candidates[k - 1][0] < ring * cell_size:
+                    break
+
+        candidates.sort()
+        graph[nodes[index]] = [(nodes[other], dist) for dist, other in candidates[:k]]
+
+    return graph
+
+def build_knn_graph_numpy(nodes, k=5, centers=None, cell_size=None):
+    """
+    Vectorized build_knn_graph: the same spatial hash, measured a block at a time with NumPy.
+
+    Nodes are sorted by grid cell, and every cell's nodes are measured
+    against the nodes in the surrounding cells as one distance matrix.
+    `argpartition` picks each row's k closest without sorting the block,
+    and rows whose k-th neighbor could still be beaten from further out
+    are measured again with one more ring of cells. The result is the same
+    graph that build_knn_graph returns, including the order of tied neighbors.
+
+    Args:
+        nodes (list): The graph nodes.
+        k (int): Number of neighbors per node.
+        centers (array): (n, 2) array of the node centers, read from the nodes' `center` when None.
+        cell_size (float): Side of a grid cell, picked from the node density when None.
+
+    Returns:
+        Graph: Each node mapped to its k closest (neighbor, distance) pairs, closest first.
+    """
+    if np is None:
+        raise ImportError('build_knn_graph_numpy needs numpy, use build_knn_graph instead')
+
+    count = len(nodes)
+    if count == 0:
+        return Graph()
+    k = min(k, count - 1)
+    if k <= 0:
+        return Graph({node: [] for node in nodes})
+
+    if centers is None:
+        centers = [node.center for node in nodes]
+    centers = np.asarray(centers, dtype=np.float64).reshape(count, 2)
+    low, high = centers.min(axis=0), centers.max(axis=0)
+
+    # Aim for roughly k nodes per cell, like build_knn_graph
+    if cell_size is None:
+        area = max(high[0] - low[0], 1) * max(high[1] - low[1], 1)
+        cell_size = max(math.sqrt(area * k / count), 1)
+
+    # Node indexes sorted by cell, each cell being one contiguous run
+    cell_xy = ((centers - low) // cell_size).astype(np.int64)
+    columns = int(cell_xy[:, 0].max()) + 1
+    keys = cell_xy[:, 1] * columns + cell_xy[:, 0]
+    order = np.argsort(keys, kind='stable')
+    cell_keys, starts, sizes = np.unique(keys[order], return_index=True, return_counts=True)
+    runs = {(key % columns, key // columns): order[start:start + size]
+            for key, start, size in zip(cell_keys.tolist(), starts.tolist(), sizes.tolist())}
+    max_ring = max(columns, int(cell_xy[:, 1].max()) + 1)
+
+    closest = np.empty((count, k), dtype=np.int64)
+    dists = np.empty((count, k))
+
+    for (cell_x, cell_y), rows in runs.items():
+        ring = 1
+        while len(rows):
+            # Every node within `ring` cells of this one
+            candidates = np.concatenate([runs[(x, y)] for x in range(cell_x - ring, cell_x + ring + 1)
+                                         for y in range(cell_y - ring, cell_y + ring + 1) if (x, y) in runs])
+            if len(candidates) <= k:  # Not enough nodes yet, always grow
+                ring += 1
+                continue
+
+            # Same arithmetic as distance() (x * x, not the pow() behind x ** 2), so both builders agree to the last bit
+            dx = centers[None, candidates, 0] - centers[rows, None, 0]
+            dy = centers[None, candidates, 1] - centers[rows, None, 1]
+            block = np.sqrt(dx * dx + dy * dy)
+            block[rows[:, None] == candidates[None, :]] = np.inf  # A node is never its own neighbor
+
+            # k closest per row in any order, then order them by (distance, index)
+            picked = np.argpartition(block, k - 1, axis=1)[:, :k]
+            picked_dists = np.take_along_axis(block, picked, axis=1)
+            picked = candidates[picked]
+            by_distance = np.lexsort((picked, picked_dists), axis=1)
+            picked = np.take_along_axis(picked, by_distance, axis=1)
+            picked_dists = np.take_along_axis(picked_dists, by_distance, axis=1)
+
+            # argpartition may keep any of several nodes tied at the k-th distance,
+            # those rows are redone so the lowest indexes win like a stable sort
+            kth = picked_dists[:, -1:]
+            tied = (block == kth).sum(axis=1) > (picked_dists == kth).sum(axis=1)
+            for row in np.flatnonzero(tied):
+                ties = np.flatnonzero(block[row] <= kth[row])
+                ties = ties[np.lexsort((candidates[ties], block[row, ties]))][:k]
+                picked[row], picked_dists[row] = candidates[ties], block[row, ties]
+
+            # Anything in the next ring is at least `ring` cells away
+            done = (kth[:, 0] < ring * cell_size) | (ring >= max_ring)
+            closest[rows[done]] = picked[done]
+            dists[rows[done]] = picked_dists[done]
+            rows = rows[~done]
+            ring += 1
+
+    return Graph({node: [(nodes[other], dist) for other, dist in zip(neighbors, neighbor_dists)]
+                  for node, neighbors, neighbor_dists in zip(nodes, closest.tolist(), dists.tolist())})
+
+NUMPY_MIN_NODES = 200  # Below this the per-cell NumPy calls cost more than they save
+
+def build_fastest(nodes, k=5):
+    """Builds the k-nearest graph with NumPy when it is installed and the graph is big enough to gain from it."""
+    if np is not None and len(nodes) >= NUMPY_MIN_NODES:
+        return build_knn_graph_numpy(nodes, k)
+    return build_knn_graph(nodes, k)
+
+class GraphCache():
+    """Keeps built graphs for node layouts that have already been seen."""
+    def __init__(self, max_size=8):
+        self.max_size = max_size
+        self.graphs = {}  # (k, nodes, centers) -> graph, oldest first
+
+    def get(self, nodes, k=5):
+        # The same node objects at the same positions always produce the same graph
+        key = (k, tuple(nodes), tuple(node.center for node in nodes))
+        graph = self.graphs.pop(key, None)
+        if graph is None:
+            graph = build_fastest(nodes, k)
+        self.graphs[key] = graph  # Move to the newest end
+        while len(self.graphs) > self.max_size:
+            del self.graphs[next(iter(self.graphs))]
+        return graph
+
+graph_cache = GraphCache()
@@ -0,0 +1,182 @@
+import heapq
+from itertools import count
+
+# ==============================
+# GRID PATHFINDING
+# ==============================
+# A* that runs straight on a 2D occupancy grid instead of a node graph,
+# with Jump Point Search (JPS) as an option. Moves are 4-connected (Up,
+# Right, Down, Left) and cost 1 each, like the Pacman maze and the Tower
+# Defense road. Cells are (row, col) tuples.
+#   grid = GridMap.from_rows(tilemap['tile'], lambda tile: tile == ROAD)
+#   path = GridPathfinder(grid).find_path((5, 0), (10, 15), jps=True)
+#
+# JPS skips over every cell of a straight run that has nothing new to
+# offer, so only corners and cells next to wall openings ever reach the
+# open set. Paths are vertical first: a vertical run looks sideways from
+# every cell it passes, and a horizontal run only turns where a wall
+# beside it ends.
+
+class GridMap():
+    """Row-major occupancy grid, a cell is blocked when its value is in `blocked`."""
+    def __init__(self, rows, cols, cells, blocked=(1,)):
+        self.rows = rows  # Number of rows in the grid
+        self.cols = cols  # Number of columns in the grid
+        self.cells = cells  # Row-major tile values, shared rather than copied
+        self.blocked = frozenset(blocked)  # Tile values that can't be walked on
+        if len(cells) != rows * cols:
+            raise ValueError(f'Expected {rows * cols} cells, got {len(cells)}')
+
+    @classmethod
+    def from_rows(cls, rows, is_open):
+        """Builds a grid from a list of rows, is_open(tile) tells which tiles are walkable."""
+        cells = bytearray(0 if is_open(tile) else 1 for row in rows for tile in row)
+        return cls(len(rows), len(rows[0]) if rows else 0, cells)
+
+    def is_open(self, row, col):
+        return 0 <= row < self.rows and 0 <= col < self.cols and self.cells[row * self.cols + col] not in self.blocked
+
+class GridPathfinder():
+    """A* and JPS over a GridMap, with a copy of its walkable cells padded by a blocked border."""
+    def __init__(self, grid):
+        self.grid = grid  # GridMap searched
+        self.width = grid.cols + 2  # Padded row length, the border removes every bounds check
+        self.passable = bytearray((grid.rows + 2) * self.width)  # 1 = walkable, padded flat index per cell
+        self.expanded = 0  # Nodes expanded by the last search
+        self.rebuild()
+
+    def rebuild(self):  # Re-read every cell of the grid
+        for row in range(self.grid.rows):
+            for col in range(self.grid.cols):
+                self.refresh(row, col)
+
+    def refresh(self, row, col):  # Re-read one cell after the grid was edited
+        self.passable[self.index((row, col))] = self.grid.is_open(row, col)
+
+    def index(self, cell):  # (row, col) -> padded flat index
+        return (cell[0] + 1) * self.width + cell[1] + 1
+
+    def cell(self, index):  # Padded flat index -> (row, col)
+        row, col = divmod(index, self.width)
+        return row - 1, col - 1
+
+    def find_path(self, start, goal, jps=False):
+        """
+        Shortest 4-connected path between two cells.
+
+        Args:
+            start (tuple): (row, col) to start from.
+            goal (tuple): (row, col) to reach.
+            jps (bool): Use Jump Point Search instead of plain A*, same paths with far fewer expansions.
+
+        Returns:
+            list: Every (row, col) from start to goal, or None if the goal can't be reached.
+        """
+        self.expanded = 0
+        if not (self.grid.is_open(*start) and self.grid.is_open(*goal)):
+            return None
+        start, goal = self.index(start), self.index(goal)
+        parents = self.search(start, goal, self.jump_successors if jps else self.step_successors)
+        if parents is None:
+            return None
+
+        # Walk the parent links back, filling in the straight runs JPS jumped over
+        path = [goal]
+        node = goal
+        while parents[node] is not None:
+            parent = parents[node]
+            step = self.direction(parent, node)
+            while node != parent:
+                node -= step
+                path.append(node)
+        return [self.cell(index) for index in reversed(path)]
+
+    def direction(self, parent, node):  # Unit step (±1 or ±width) from parent towards node
+        if parent is None:
+            return 0
+        if node - parent >= self.width or parent - node >= self.width:
+            return self.width if node > parent else -self.width
+        return 1 if node > parent else -1
+
+    def search(self, start, goal, successors):  # A* over padded indexes, returns the parent links
+        width = self.width
+        goal_row, goal_col = divmod(goal, width)
+        tie = count()  # Breaks (f, g) ties without comparing anything else
+        g_scores = {start: 0}
+        parents = {start: None}
+        closed_set = set()
+        open_set = [(0, 0, next(tie), start)]
+
+        while open_set:
+            _, _, _, current = heapq.heappop(open_set)
+            if current in closed_set:
+                continue  # Stale entry left behind by a better push
+            if current == goal:
+                return parents
+            closed_set.add(current)
+            self.expanded += 1
+
+            for neighbor, cost in successors(current, self.direction(parents[current], current), goal):
+                if neighbor in closed_set:
+                    continue
+                tentative_g_score = g_scores[current] + cost
+                if tentative_g_score < g_scores.get(neighbor, float('inf')):
+                    g_scores[neighbor] = tentative_g_score
+                    parents[neighbor] = current
+                    row, col = divmod(neighbor, width)
+                    f_score = tentative_g_score + abs(row - goal_row) + abs(col - goal_col)  # Manhattan heuristic
+                    # Deeper nodes first on equal f, so ties follow one path instead of flooding
+                    heapq.heappush(open_set, (f_score, -tentative_g_score, next(tie), neighbor))
+
+        return None  # No path found
+
+    def step_successors(self, node, direction, goal):  # Plain A*: the open neighbors
+        passable = self.passable
+        for step in (-self.width, 1, self.width, -1):
+            if passable[node + step]:
+                yield node + step, 1
+
+    def jump_successors(self, node, direction, goal):  # JPS: the jump points reachable from node
+        width = self.width
+        if direction == 0:  # Start node, every direction
+            steps = (-width, 1, width, -1)
+        elif direction in (1, -1):  # Horizontal run, keep going and turn only into forced openings
+            passable = self.passable
+            steps = [direction]
+            for side in (-width, width):
+                if passable[node + side] and not passable[node + side - direction]:
+                    steps.append(side)
+        else:  # Vertical run, keep going and look both ways
+            steps = (direction, 1, -1)
+
+        for step in steps:
+            jump_point = self.jump(node, step, goal)
+            if jump_point is not None:
+                yield jump_point, abs(jump_point - node) // (width if step in (width, -width) else 1)
+
+    def jump(self, node, step, goal):  # Next jump point from node along step, None at a dead end
+        if step in (1, -1):
+            return self.jump_horizontal(node, step, goal)
+        passable = self.passable
+        while True:
+            node += step
+            if not passable[node]:
+                return None
+            if node == goal:
+                return node
+            # A vertical run stops wherever a sideways run would find something
+            if self.jump_horizontal(node, 1, goal) is not None or self.jump_horizontal(node, -1, goal) is not None:
+                return node
+
+    def jump_horizontal(self, node, step, goal):
+        passable, width = self.passable, self.width
+        while True:
+            node += step
+            if not passable[node]:
+                return None
+            if node == goal:
+                return node
+            # Forced neighbor: the wall above or below just ended, so a turn here can't be taken earlier
+            if (passable[node - width] and not passable[node - width - step]) or \
+               (passable[node + width] and not passable[node + width - step]):
+                return node
@@ -0,0 +1,145 @@
+import os
+from allpairs import NextHopTable, index_graph, reverse_dijkstra, walk_hops
+from search import a_star, find_path, path_cache
+
+# ==============================
+# PATH PLANNER
+# ==============================
+# One place to ask for paths. Small graphs get an all-pairs next-hop
+# table, built once per graph version, and every query is a table walk.
+# Bigger graphs go through A* and the shared path cache.
+#
+# Batches of queries (one per agent) are deduplicated first. Every goal
+# wanted by several agents is then answered by a single Dijkstra run
+# backwards from it, and goals wanted by only a few agents get an A* each.
+# Goals can be spread over a concurrent.futures thread or process pool.
+
+ALL_PAIRS_MAX_NODES = 500  # Largest graph that gets an all-pairs table (n² next hops)
+SHARED_GOAL_MIN_STARTS = 4  # Agents per goal from which one reverse Dijkstra beats an A* each
+
+def solve_goals(graph, jobs, method='astar'):
+    """
+    Answers a share of a batch, on node indexes so that it can run in a process pool.
+
+    Args:
+        graph (dict): The graph being searched (a copy of it in a process pool).
+        jobs (list): (goal, starts) pairs of node indexes.
+        method (str): find_path method for goals that aren't shared, those that are always get shortest paths.
+
+    Returns:
+        dict: (start, goal) mapped to the node indexes of its path, or None.
+    """
+    nodes = list(graph)
+    index = {node: i for i, node in enumerate(nodes)}
+    reverse = None  # Reversed edges, only built if some goal is shared
+    results = {}
+    for goal, starts in jobs:
+        if len(starts) >= SHARED_GOAL_MIN_STARTS:  # One tree into the goal serves every agent heading there
+            if reverse is None:
+                reverse = index_graph(graph)[2]
+            hops = reverse_dijkstra(goal, reverse, starts)[0]
+            for start in starts:
+                results[(start, goal)] = walk_hops(hops, start, goal)
+        else:
+            for start in starts:
+                path = a_star(nodes[start], nodes[goal], graph) if method == 'astar' else \
+                       find_path(nodes[start], nodes[goal], graph, method).path
+                results[(start, goal)] = [index[node] for node in path] if path is not None else None
+    return results
+
+class Planner():
+    """Picks between an all-pairs table and cached A* by graph size."""
+    def __init__(self, all_pairs_max_nodes=ALL_PAIRS_MAX_NODES, cache=path_cache, workers=None, method='astar'):
+        self.all_pairs_max_nodes = all_pairs_max_nodes
+        self.method = method  # find_path method used on graphs without a table
+        self.search = a_star if method == 'astar' else lambda start, end, graph: find_path(start, end, graph, method).path
+        self.cache = cache  # PathCache used for graphs without a table
+        self.workers = workers  # Processes for building tables (serial when None) and shares per pooled batch
+        self.table = None  # NextHopTable of the last small graph seen
+
+    def table_for(self, graph):
+        """The all-pairs table of a graph, or None if it is too big or has no version to check."""
+        if len(graph) > self.all_pairs_max_nodes or getattr(graph, 'version', None) is None:
+            return None
+        if self.table is None or not self.table.is_current(graph):
+            self.table = NextHopTable(graph, self.workers)
+        return self.table
+
+    def path(self, start, end, graph):
+        """
+        Shortest path from start to end.
+
+        Args:
+            start: The starting node.
+            end: The goal node.
+            graph (Graph): The graph to search.
+
+        Returns:
+            list: The nodes from start to end, or None if there is no path.
+        """
+        table = self.table_for(graph)
+        if table is not None:
+            return table.path(start, end)
+        return self.cache.get(start, end, graph, self.search)
+
+    def lookup(self, start, end, graph):
+        """
+        Path answered without a search, from the all-pairs table or the cache.
+
+        For callers that run missed searches themselves, over several frames
+        or in the background, and hand the paths back with store.
+
+        Returns:
+            tuple: (True, path) when answered, path being None if there is none, (False, None) on a miss.
+        """
+        table = self.table_for(graph)
+        if table is not None:
+            return True, table.path(start, end)
+        return self.cache.lookup(start, end, graph, self.search)
+
+    def store(self, start, end, version, path):
+        """Caches a path that a lookup missed, for the graph version it was searched on."""
+        if version is not None:
+            self.cache.store(start, end, version, path, self.search)
+
+    def paths(self, queries, graph, executor=None):
+        """
+        Shortest paths for a whole batch of agents at once.
+
+        Args:
+            queries (list): (start, goal) node pairs, repeats are searched once.
+            graph (Graph): The graph to search.
+            executor (Executor): Thread or process pool to spread the goals over, or None to run here.
+
+        Returns:
+            list: One path (a list of nodes, or None) per query, in query order.
+        """
+        unique = list(dict.fromkeys(queries))
+        table = self.table_for(graph)
+        if table is not None:
+            found = {query: table.path(*query) for query in unique}
+            return [list(found[query]) if found[query] is not None else None for query in queries]
+
+        # Group the distinct starts by goal, as node indexes
+        nodes = list(graph)
+        index = {node: i for i, node in enumerate(nodes)}
+        goals = {}
+        for start, goal in unique:
+            goals.setdefault(index[goal], []).append(index[start])
+        jobs = list(goals.items())
+
+        if executor is None or len(jobs) < 2:
+            results = solve_goals(graph, jobs, self.method)
+        else:
+            # One share per worker (and never an empty one), so a process pool copies the graph once per worker
+            shares = min(self.workers or os.cpu_count() or 1, len(jobs))
+            futures = [executor.submit(solve_goals, graph, jobs[share::shares], self.method) for share in range(shares)]
+            results = {}
+            for future in futures:
+                results.update(future.result())
+
+        paths = []
+        for start, goal in queries:
+            path = results[(index[start], index[goal])]
+            paths.append([nodes[node] for node in path] if path is not None else None)
+        return paths
@@ -0,0 +1,111 @@
+import time
+from collections import deque
+from graphs import distance
+from search import SearchResult, weighted_a_star_steps
+
+# ==============================
+# TIME-SLICED PATHFINDING
+# ==============================
+# Searches that run a little every frame instead of all at once. Each one
+# is a search.weighted_a_star_steps generator, which stops after every
+# expansion, and the scheduler keeps stepping the queued searches until
+# the frame's budget (expansions or seconds) is spent, then leaves the
+# rest for the next frame. A search that finishes hands its SearchResult
+# to its callback, or keeps it for the game loop to poll.
+#   scheduler = PathScheduler(max_expansions=100)
+#   job = scheduler.submit(start, end, graph)
+#   ...
+#   scheduler.update()  # Once per frame
+#   if job.done():
+#       path = job.result().path
+
+class SearchJob():
+    """One queued search and its callback."""
+    def __init__(self, steps, callback, weight):
+        self.steps = steps  # weighted_a_star_steps generator
+        self.callback = callback  # Called with the SearchResult when the search ends, or None to poll instead
+        self.weight = weight
+        self.elapsed = 0.0  # Seconds spent on it over every frame
+        self.frames = 0  # Frames it got some of the budget in
+        self._result = None  # SearchResult once done
+        self.cancelled = False
+
+    # done() and result() like concurrent.futures.Future and workers.PathRequest, so either can be polled
+    def done(self):
+        return self._result is not None
+
+    def result(self):
+        """The SearchResult, None while the search is still running."""
+        return self._result
+
+class PathScheduler():
+    """Spreads searches over frames, first come first served, within a budget per frame."""
+    def __init__(self, max_expansions=200, time_budget=None):
+        """
+        Args:
+            max_expansions (int): Nodes expanded per update over every search, no limit when None.
+            time_budget (float): Seconds per update over every search, no limit when None.
+        """
+        self.max_expansions = max_expansions
+        self.time_budget = time_budget
+        self.jobs = deque()  # Searches not finished yet, oldest first
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def submit(self, start, end, graph, callback=None, heuristic=distance, weight=1.0):
+        """
+        Queues a search, nothing runs until the next update.
+
+        Args:
+            start: The starting node.
+            end: The goal node.
+            graph (dict): A dictionary of nodes with their neighbors.
+            callback (function): Called with the SearchResult once the search ends, or None to poll the job.
+            heuristic (function): Estimated cost between two nodes, Euclidean by default.
+            weight (float): Heuristic inflation, 1 for the shortest path.
+
+        Returns:
+            SearchJob: Handle that can be cancelled or checked.
+        """
+        job = SearchJob(weighted_a_star_steps(start, end, graph, heuristic, weight), callback, weight)
+        self.jobs.append(job)
+        return job
+
+    def cancel(self, job):
+        """Drops a search before it finishes, its callback is never called."""
+        job.cancelled = True
+        if job in self.jobs:
+            self.jobs.remove(job)
+        job.steps.close()
+
+    def update(self):
+        """
+        Runs the queued searches until this frame's budget is spent.
+
+        Returns:
+            int: Nodes expanded during this update.
+        """
+        began = time.perf_counter()
+        expansions = 0
+        while self.jobs:
+            job = self.jobs[0]
+            job.frames += 1
+            slice_began = time.perf_counter()
+            try:
+                while True:
+                    if (self.max_expansions is not None and expansions >= self.max_expansions) or \
+                       (self.time_budget is not None and time.perf_counter() - began >= self.time_budget):
+                        job.elapsed += time.perf_counter() - slice_began
+                        return expansions  # Out of budget, resume on the next update
+                    next(job.steps)
+                    expansions += 1
+            except StopIteration as finished:
+                path, cost, expanded = finished.value
+            job.elapsed += time.perf_counter() - slice_began
+            self.jobs.popleft()
+            job._result = SearchResult(path, cost, expanded, job.elapsed, job.weight,
+                                       'astar' if job.weight == 1 else 'weighted')
+            if job.callback is not None:
+                job.callback(job._result)
+        return expansions
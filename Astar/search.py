@@ -0,0 +1,415 @@
+import heapq, time
+from itertools import count
+from graphs import distance
+
+# ==============================
+# GRAPH SEARCH
+# ==============================
+# Every search keeps its own g-scores, parents and open/closed sets, so
+# nothing is stored on the nodes and the same graph can be searched any
+# number of times (even from several places at once).
+
+def reconstruct_path(current, parents):
+    """
+    Walks the parent links back from the goal.
+
+    Args:
+        current: The goal node.
+        parents (dict): Each reached node mapped to the node it was reached from.
+
+    Returns:
+        list: The nodes from start to goal.
+    """
+    path = []
+    while current is not None:
+        path.append(current)
+        current = parents[current]
+    return path[::-1]  # Reverse the path to get it from start to end
+
+class SearchResult():
+    """Outcome of one search: the path and what it cost to find it."""
+    __slots__ = ('path', 'cost', 'expanded', 'elapsed', 'bound', 'method')
+
+    def __init__(self, path, cost, expanded, elapsed, bound=1.0, method='astar'):
+        self.path = path  # Nodes from start to end, or None
+        self.cost = cost  # Length of the path, inf without one
+        self.expanded = expanded  # Nodes expanded
+        self.elapsed = elapsed  # Seconds spent searching
+        self.bound = bound  # The path is at most this many times longer than the shortest one
+        self.method = method  # Search that produced it
+
+    def __repr__(self):
+        return (f'SearchResult({self.method}, {len(self.path) if self.path else 0} nodes, cost={self.cost:.1f}, '
+                f'expanded={self.expanded}, {self.elapsed * 1000:.2f} ms, bound={self.bound:.2f})')
+
+def weighted_a_star_steps(start, end, graph, heuristic=distance, weight=1.0, pause=True):
+    """
+    Resumable heap-based A* over a {node: [(neighbor, distance)]} graph, with an inflated heuristic.
+
+    The open set is a binary heap with lazy deletion: an improved node is
+    pushed again and stale entries are skipped when popped, and a closed
+    set makes sure each node is expanded once. A weight above 1 ranks
+    nodes by g + weight * h, which heads for the goal more greedily and
+    finds a path at most `weight` times longer than the shortest one.
+
+    Yields the number of nodes expanded so far after every expansion, so the
+    search can be paused between any two of them (see scheduler.py). The
+    graph should not change while it is paused. With pause off it never
+    yields, and the first next() runs the whole search.
+
+    Args:
+        start: The starting node.
+        end: The goal node.
+        graph (dict): A dictionary of nodes with their neighbors.
+        heuristic (function): Estimated cost between two nodes, Euclidean by default.
+        weight (float): Heuristic inflation, 1 for plain A*.
+        pause (bool): Yield after every expansion.
+
+    Returns:
+        tuple: (path, cost, expanded) once exhausted, path being None if there is none.
+    """
+    tie = count()  # Breaks f-score ties without ever comparing nodes
+    g_scores = {start: 0}  # Cost from the start node to each reached node
+    parents = {start: None}  # To reconstruct the final path
+    closed_set = set()  # Nodes already expanded
+    open_set = [(weight * heuristic(start, end), next(tie), start)]
+
+    while open_set:
+        _, _, current = heapq.heappop(open_set)  # Node with the lowest f-score
+        if current in closed_set:
+            continue  # Stale entry left behind by a better push
+        if current == end:
+            return reconstruct_path(current, parents), g_scores[current], len(closed_set)
+        closed_set.add(current)
+
+        for neighbor, edge in graph[current]:
+            if neighbor in closed_set:
+                continue
+            tentative_g_score = g_scores[current] + edge
+            if tentative_g_score < g_scores.get(neighbor, float('inf')):
+                g_scores[neighbor] = tentative_g_score
+                parents[neighbor] = current
+                heapq.heappush(open_set, (tentative_g_score + weight * heuristic(neighbor, end), next(tie), neighbor))
+        if pause:
+            yield len(closed_set)
+
+    return None, float('inf'), len(closed_set)  # No path found
+
+def weighted_a_star(start, end, graph, heuristic=distance, weight=1.0):
+    """
+    Weighted A* in one go, see weighted_a_star_steps.
+
+    Returns:
+        tuple: (path, cost, expanded), path being None if there is none.
+    """
+    try:
+        next(weighted_a_star_steps(start, end, graph, heuristic, weight, pause=False))
+    except StopIteration as finished:
+        return finished.value
+
+def a_star(start, end, graph, heuristic=distance):
+    """
+    Shortest path with plain A*, see weighted_a_star.
+
+    Returns:
+        list: The shortest path from start to end, or None if there is none.
+    """
+    return weighted_a_star(start, end, graph, heuristic)[0]
+
+_reversed_graphs = {}  # Graph version -> (graph, reversed edges), only the newest kept
+
+def reversed_graph(graph):
+    """The graph with every edge turned around, cached per Graph version."""
+    version = getattr(graph, 'version', None)
+    cached = _reversed_graphs.get(version)
+    # A copy unpickled in a worker process keeps the version but has nodes of its own
+    if version is not None and cached is not None and cached[0] is graph:
+        return cached[1]
+    reverse = {node: [] for node in graph}
+    for node, edges in graph.items():
+        for neighbor, dist in edges:
+            reverse.setdefault(neighbor, []).append((node, dist))
+    if version is not None:
+        _reversed_graphs.clear()
+        _reversed_graphs[version] = (graph, reverse)
+    return reverse
+
+class _Frontier():
+    """One direction of a bidirectional search."""
+    __slots__ = ('graph', 'target', 'g_scores', 'parents', 'closed_set', 'open_set')
+
+    def __init__(self, graph, origin, target, heuristic, tie):
+        self.graph = graph  # Edges followed by this direction
+        self.target = target  # Node this direction heads for
+        self.g_scores = {origin: 0}
+        self.parents = {origin: None}
+        self.closed_set = set()
+        self.open_set = [(heuristic(origin, target), next(tie), origin)]
+
+def bidirectional_a_star(start, end, graph, heuristic=distance):
+    """
+    A* from both ends at once, the forward search over the edges and the backward one over the reversed edges.
+
+    The smaller frontier is expanded next, every edge that touches a node
+    reached by the other side is a candidate meeting point, and the search
+    stops once neither frontier can offer anything shorter than the best
+    meeting found.
+
+    Args:
+        start: The starting node.
+        end: The goal node.
+        graph (dict): A dictionary of nodes with their neighbors.
+        heuristic (function): Consistent estimate of the cost between two nodes.
+
+    Returns:
+        tuple: (path, cost, expanded), path being None if there is none.
+    """
+    if start == end:
+        return [start], 0, 0
+
+    tie = count()
+    forward = _Frontier(graph, start, end, heuristic, tie)
+    backward = _Frontier(reversed_graph(graph), end, start, heuristic, tie)
+    best_cost, meeting = float('inf'), None
+
+    while forward.open_set and backward.open_set:
+        if max(forward.open_set[0][0], backward.open_set[0][0]) >= best_cost:
+            break  # Any path through either frontier is at least as long as the best one
+        side, other = (forward, backward) if len(forward.open_set) <= len(backward.open_set) else (backward, forward)
+        _, _, current = heapq.heappop(side.open_set)
+        if current in side.closed_set:
+            continue  # Stale entry left behind by a better push
+        side.closed_set.add(current)
+
+        for neighbor, edge in side.graph[current]:
+            tentative_g_score = side.g_scores[current] + edge
+            if neighbor not in side.closed_set and tentative_g_score < side.g_scores.get(neighbor, float('inf')):
+                side.g_scores[neighbor] = tentative_g_score
+                side.parents[neighbor] = current
+                heapq.heappush(side.open_set, (tentative_g_score + heuristic(neighbor, side.target), next(tie), neighbor))
+            if neighbor in other.g_scores and side.g_scores[neighbor] + other.g_scores[neighbor] < best_cost:
+                best_cost, meeting = side.g_scores[neighbor] + other.g_scores[neighbor], neighbor
+
+    expanded = len(forward.closed_set) + len(backward.closed_set)
+    if meeting is None:
+        return None, float('inf'), expanded
+
+    # Start to the meeting node, then along the backward parents to the end
+    path = reconstruct_path(meeting, forward.parents)
+    node = backward.parents[meeting]
+    while node is not None:
+        path.append(node)
+        node = backward.parents[node]
+    return path, best_cost, expanded
+
+class AnytimeSearch():
+    """
+    Anytime Repairing A* (ARA*): a quick inflated-heuristic path first, then better ones.
+
+    Each pass is a weighted A* that reuses everything the previous passes
+    found, and after each pass the weight drops by `step` until it reaches 1
+    and the path is the shortest. improve() can be stopped after any number
+    of expansions or seconds and picks up where it left off on the next
+    call, so a game can run it a little every frame.
+    """
+    def __init__(self, start, end, graph, heuristic=distance, weight=2.0, step=0.5):
+        self.start = start
+        self.end = end
+        self.graph = graph
+        self.heuristic = heuristic
+        self.weight = weight  # Inflation of the current pass
+        self.step = step  # How much the weight drops after each pass
+        self.tie = count()
+        self.g_scores = {start: 0}
+        self.parents = {start: None}
+        self.closed_set = set()  # Expanded during the current pass
+        self.inconsistent = set()  # Improved after being expanded, reopened by the next pass
+        self.open_nodes = {start}
+        self.open_set = [(weight * heuristic(start, end), next(self.tie), start, 0)]
+        self.expanded = 0  # Nodes expanded over every pass
+        self.elapsed = 0.0  # Seconds spent over every call
+        self.done = False  # The result can't improve any more
+        self.result = SearchResult(None, float('inf'), 0, 0.0, float('inf'), 'anytime')
+
+    def improve(self, time_budget=None, max_expansions=None):
+        """
+        Keeps searching until the path is optimal or a budget runs out.
+
+        Args:
+            time_budget (float): Seconds to spend in this call, no limit when None.
+            max_expansions (int): Nodes to expand in this call, no limit when None.
+
+        Returns:
+            SearchResult: The best path so far (None until the first pass finishes).
+        """
+        began = time.perf_counter()
+        expansions = 0
+        heuristic, end = self.heuristic, self.end
+
+        while not self.done:
+            goal_g_score = self.g_scores.get(end, float('inf'))
+            while self.open_set:
+                f_score, _, current, g_score = self.open_set[0]
+                if current in self.closed_set or g_score != self.g_scores[current]:
+                    heapq.heappop(self.open_set)  # Stale entry
+                    continue
+                if goal_g_score <= f_score:
+                    break  # Nothing left in the open set can improve this pass's path
+                if (max_expansions is not None and expansions >= max_expansions) or \
+                   (time_budget is not None and time.perf_counter() - began >= time_budget):
+                    self.elapsed += time.perf_counter() - began
+                    self.result.elapsed = self.elapsed
+                    return self.result  # Out of budget, resume on the next call
+
+                heapq.heappop(self.open_set)
+                self.open_nodes.discard(current)
+                self.closed_set.add(current)
+                expansions += 1
+                self.expanded += 1
+
+                for neighbor, edge in self.graph[current]:
+                    tentative_g_score = g_score + edge
+                    if tentative_g_score < self.g_scores.get(neighbor, float('inf')):
+                        self.g_scores[neighbor] = tentative_g_score
+                        self.parents[neighbor] = current
+                        if neighbor == end:
+                            goal_g_score = tentative_g_score
+                        if neighbor in self.closed_set:
+                            self.inconsistent.add(neighbor)  # Left for the next pass
+                        else:
+                            self.open_nodes.add(neighbor)
+                            heapq.heappush(self.open_set, (tentative_g_score + self.weight * heuristic(neighbor, end),
+                                                           next(self.tie), neighbor, tentative_g_score))
+
+            self.publish()
+            if self.weight <= 1 or end not in self.g_scores:
+                self.done = True  # Shortest path found, or there is no path at all
+                break
+
+            # Next pass: lower weight, reopen everything left over
+            self.weight = max(1.0, self.weight - self.step)
+            self.open_nodes |= self.inconsistent
+            self.inconsistent.clear()
+            self.closed_set.clear()
+            self.open_set = [(self.g_scores[node] + self.weight * heuristic(node, end), next(self.tie), node,
+                              self.g_scores[node]) for node in self.open_nodes]
+            heapq.heapify(self.open_set)
+
+        self.elapsed += time.perf_counter() - began
+        self.result.elapsed = self.elapsed
+        return self.result
+
+    def publish(self):  # Store the path of the pass that just finished
+        if self.end not in self.g_scores:
+            self.result = SearchResult(None, float('inf'), self.expanded, self.elapsed, float('inf'), 'anytime')
+            return
+        cost = self.g_scores[self.end]
+        # No path can be shorter than the best g + h left in the open or inconsistent nodes
+        lower = min((self.g_scores[node] + self.heuristic(node, self.end) for node in self.open_nodes | self.inconsistent),
+                    default=cost)
+        bound = min(self.weight, cost / lower) if lower > 0 else 1.0
+        self.result = SearchResult(reconstruct_path(self.end, self.parents), cost, self.expanded, self.elapsed,
+                                   max(bound, 1.0), 'anytime')
+
+METHODS = ('astar', 'bidirectional', 'weighted', 'anytime')
+
+def find_path(start, end, graph, method='astar', heuristic=distance, weight=2.0, time_budget=None):
+    """
+    One entry point for every search in this module.
+
+    Args:
+        start: The starting node.
+        end: The goal node.
+        graph (dict): A dictionary of nodes with their neighbors.
+        method (str): 'astar', 'bidirectional', 'weighted' (g + weight * h) or 'anytime' (ARA*).
+        heuristic (function): Estimated cost between two nodes, Euclidean by default.
+        weight (float): Heuristic inflation for 'weighted', and the first pass of 'anytime'.
+        time_budget (float): Seconds 'anytime' may spend, it returns its best path so far when they run out.
+
+    Returns:
+        SearchResult: The path, its cost, the nodes expanded and the time taken.
+    """
+    began = time.perf_counter()
+    if method == 'astar':
+        path, cost, expanded = weighted_a_star(start, end, graph, heuristic)
+        bound = 1.0
+    elif method == 'weighted':
+        path, cost, expanded = weighted_a_star(start, end, graph, heuristic, weight)
+        bound = weight
+    elif method == 'bidirectional':
+        path, cost, expanded = bidirectional_a_star(start, end, graph, heuristic)
+        bound = 1.0
+    elif method == 'anytime':
+        return AnytimeSearch(start, end, graph, heuristic, weight).improve(time_budget)
+    else:
+        raise ValueError(f'Unknown search method {method!r}, expected one of {METHODS}')
+    return SearchResult(path, cost, expanded, time.perf_counter() - began, bound, method)
+
+class PathCache():
+    """
+    LRU cache of found paths, keyed by (start, end, graph version, search).
+
+    Only Graphs carry a version, so searches on plain dictionaries always run.
+    Entries of older graph versions are never hit again and age out on their own.
+    """
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.paths = {}  # (start, end, version, search) -> path, oldest first
+        self.hits = 0  # Searches answered from the cache
+        self.misses = 0  # Searches that had to run
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, start, end, graph, search=a_star):
+        """
+        Shortest path from start to end, searched only on a miss.
+
+        Args:
+            start: The starting node.
+            end: The goal node.
+            graph (Graph): The graph to search.
+            search (function): Search to run on a miss, called as search(start, end, graph).
+
+        Returns:
+            list: A fresh copy of the path, or None if there is none.
+        """
+        found, path = self.lookup(start, end, graph, search)
+        if found:
+            return path
+        path = search(start, end, graph)
+        version = getattr(graph, 'version', None)
+        if version is not None:
+            self.store(start, end, version, path, search)
+        return list(path) if path is not None else None
+
+    def lookup(self, start, end, graph, search=a_star):
+        """
+        Cached path without searching, for callers that run the search themselves (see store).
+
+        Returns:
+            tuple: (True, a fresh copy of the path) on a hit, (False, None) on a miss.
+        """
+        version = getattr(graph, 'version', None)
+        key = (start, end, version, search)
+        if version is None or key not in self.paths:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        path = self.paths.pop(key)
+        self.paths[key] = path  # Move to the newest end
+        return True, list(path) if path is not None else None
+
+    def store(self, start, end, version, path, search=a_star):
+        """Caches a path found outside get, for the graph version it was searched on."""
+        self.paths[(start, end, version, search)] = list(path) if path is not None else None
+        while len(self.paths) > self.max_size:
+            del self.paths[next(iter(self.paths))]
+
+    def clear(self):
+        self.paths.clear()
+        self.hits = self.misses = 0
+
+path_cache = PathCache()
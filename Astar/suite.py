@@ -0,0 +1,123 @@
+import argparse, json, platform, random, time, tracemalloc
+from generators import GENERATORS, maze_grid, grid_graph
+from gridpath import GridPathfinder
+from search import METHODS, find_path
+
+# ==============================
+# PATHFINDING BENCHMARK SUITE
+# ==============================
+# Runs every search over every generator and size with fixed seeds, and
+# writes the results as JSON so two versions of the code can be compared.
+# Run from the Astar folder:
+#   python suite.py --output before.json
+#   python suite.py --output after.json --compare before.json
+#
+# Each method runs its queries twice: once timed, once under tracemalloc
+# for the peak memory (tracing slows everything down, so it never touches
+# the timings). Graph building is not counted in either, and one untimed
+# query runs first so one-off setup (bidirectional's reversed graph) is
+# left out too.
+
+VERSION = 1
+SIZES = (100, 1000, 10000, 100000)
+GRID_METHODS = ('grid-astar', 'grid-jps')  # gridpath searches, maze only
+
+def run_queries(search, queries):
+    """Runs a search over every query, returns (found, expanded, seconds)."""
+    found = expanded = 0
+    start = time.perf_counter()
+    for query in queries:
+        path, nodes = search(*query)
+        found += path is not None
+        expanded += nodes
+    return found, expanded, time.perf_counter() - start
+
+def peak_memory(search, queries):
+    """Peak bytes allocated while running the queries."""
+    tracemalloc.start()
+    for query in queries:
+        search(*query)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+def graph_search(method, graph):
+    def search(start, end):
+        result = find_path(start, end, graph, method)
+        return result.path, result.expanded
+    return search
+
+def grid_search(jps, pathfinder):
+    def search(start, end):
+        path = pathfinder.find_path(start, end, jps)
+        return path, pathfinder.expanded
+    return search
+
+def bench(generator, size, queries, seed):
+    """Every method on one generated graph, returns one result per method."""
+    rng = random.Random(seed)
+    if generator == 'maze':
+        grid = maze_grid(size, seed)
+        graph = grid_graph(grid)
+        cells = {node: (node.center[1], node.center[0]) for node in graph}  # Graph node -> (row, col)
+    else:
+        graph = GENERATORS[generator](size, seed)
+    nodes = list(graph)
+    pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(queries)]
+
+    searches = {method: (graph_search(method, graph), pairs) for method in METHODS}
+    if generator == 'maze':
+        pathfinder = GridPathfinder(grid)
+        cell_pairs = [(cells[start], cells[end]) for start, end in pairs]
+        for method, jps in zip(GRID_METHODS, (False, True)):
+            searches[method] = (grid_search(jps, pathfinder), cell_pairs)
+
+    results = []
+    for method, (search, method_queries) in searches.items():
+        search(*method_queries[0])  # Warm-up
+        found, expanded, seconds = run_queries(search, method_queries)
+        results.append({
+            "generator": generator, "nodes": len(graph), "edges": sum(len(edges) for edges in graph.values()),
+            "method": method, "queries": queries, "found": found,
+            "expanded_mean": expanded / queries, "time_ms_mean": seconds / queries * 1000,
+            "peak_kib": peak_memory(search, method_queries) / 1024,
+        })
+        print(f'{generator:8} {len(graph):7} nodes  {method:13} {results[-1]["time_ms_mean"]:10.2f} ms '
+              f'{results[-1]["expanded_mean"]:10.0f} expanded {results[-1]["peak_kib"]:9.0f} KiB peak')
+    return results
+
+def compare(results, path):
+    """Prints how the time and expansions moved against an earlier results file."""
+    with open(path, "r") as file:
+        before = {(entry["generator"], entry["nodes"], entry["method"]): entry for entry in json.load(file)["results"]}
+    print(f'\nAgainst {path}:')
+    for entry in results:
+        old = before.get((entry["generator"], entry["nodes"], entry["method"]))
+        if old is None:
+            continue
+        print(f'{entry["generator"]:8} {entry["nodes"]:7} nodes  {entry["method"]:13} '
+              f'time x{entry["time_ms_mean"] / max(old["time_ms_mean"], 1e-9):5.2f}  '
+              f'expanded x{entry["expanded_mean"] / max(old["expanded_mean"], 1e-9):5.2f}')
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pathfinding benchmark suite")
+    parser.add_argument("--generators", nargs="+", choices=list(GENERATORS), default=list(GENERATORS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES))
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    results = []
+    for generator in args.generators:
+        for size in args.sizes:
+            results.extend(bench(generator, size, args.queries, args.seed))
+
+    with open(args.output, "w") as file:
+        json.dump({"version": VERSION, "python": platform.python_version(), "seed": args.seed,
+                   "queries": args.queries, "results": results}, file, indent=2)
+    print(f'Results Saved! ({len(results)} runs -> {args.output})')
+
+    if args.compare:
+        compare(results, args.compare)
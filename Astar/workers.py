@@ -0,0 +1,160 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from generators import Point
+from search import find_path
+
+# ==============================
+# BACKGROUND PATHFINDING
+# ==============================
+# Searches that run off the game loop. Each one gets a snapshot of the
+# graph, so the game can keep editing its own graph while searches are
+# running, and the loop polls the returned request once per frame.
+#   worker = PathWorker()
+#   request = worker.submit(start, end, graph)
+#   ...
+#   if request.done():
+#       path = request.result().path
+#
+# Threads share the nodes and only copy the edge lists, but the searches
+# still take turns with the game loop on the GIL. Processes really run in
+# parallel. Their snapshot carries only each node's center, so game
+# objects are never pickled, and each process keeps the last snapshot it
+# was sent: a graph version crosses over to a process once, after that a
+# search only sends (version, start, end) as node indexes. A script that
+# uses processes must keep its own top-level code under
+# `if __name__ == "__main__":`.
+
+def snapshot_graph(graph, processes=False):
+    """
+    Frozen copy of a graph for a background search.
+
+    Args:
+        graph (dict): A dictionary of nodes with their (neighbor, distance) pairs.
+        processes (bool): Swap the nodes for Points, which pickle cheaply.
+
+    Returns:
+        tuple: (nodes, snapshot) where nodes lists the graph's own nodes in
+               the snapshot's order.
+    """
+    nodes = list(graph)
+    if not processes:
+        return nodes, {node: list(edges) for node, edges in graph.items()}
+    points = {node: Point(*node.center) for node in nodes}
+    return nodes, {points[node]: [(points[neighbor], dist) for neighbor, dist in edges] for node, edges in graph.items()}
+
+def search_snapshot(snapshot, start, end, method):
+    """Runs in a thread: find_path on a snapshot that shares the graph's nodes."""
+    return find_path(start, end, snapshot, method)
+
+# Process side: the last snapshot sent, as (version, nodes, index, snapshot)
+_worker_graph = None
+
+def search_in_worker(version, start, end, method, snapshot=None):
+    """
+    Runs in a process: find_path between two node indexes, with the path as node indexes.
+
+    The snapshot only comes along when this process doesn't have the version yet.
+    """
+    global _worker_graph
+    if snapshot is not None:
+        nodes = list(snapshot)
+        _worker_graph = (version, nodes, {node: i for i, node in enumerate(nodes)}, snapshot)
+    _, nodes, index, snapshot = _worker_graph
+    result = find_path(nodes[start], nodes[end], snapshot, method)
+    if result.path is not None:
+        result.path = [index[node] for node in result.path]
+    return result
+
+class PathRequest():
+    """A search running in the background, to be polled from the game loop."""
+    def __init__(self, future, nodes=None, carries_snapshot=False):
+        self.future = future  # concurrent.futures.Future of the SearchResult
+        self.nodes = nodes  # The graph's own nodes, to turn a path of indexes back into, None if it has the nodes
+        self.carries_snapshot = carries_snapshot  # Delivers a snapshot its process needs for later searches
+        self._result = None
+
+    def done(self):
+        return self.future.done()
+
+    def cancel(self):
+        """Drops the search if it hasn't started yet, True if it was dropped."""
+        if self.carries_snapshot:
+            return False  # Later searches on its process rely on the snapshot it brings
+        return self.future.cancel()
+
+    def result(self, timeout=None):
+        """
+        The finished search, waits for it if it is still running.
+
+        Returns:
+            SearchResult: With the path made of the graph's own nodes.
+        """
+        if self._result is None:
+            self._result = self.future.result(timeout)
+            if self.nodes is not None and self._result.path is not None:
+                self._result.path = [self.nodes[node] for node in self._result.path]
+        return self._result
+
+class PathWorker():
+    """Pool of background threads or processes searching graph snapshots."""
+    def __init__(self, workers=1, processes=False, method='astar'):
+        """
+        Args:
+            workers (int): Threads or processes in the pool.
+            processes (bool): Use processes instead of threads.
+            method (str): find_path method to search with.
+        """
+        self.processes = processes
+        self.method = method
+        self.snapshot = None  # (version, nodes, index, snapshot) of the last Graph seen, reused until it changes
+        if processes:
+            # One single-process pool each, so every search goes to a process known to hold its snapshot
+            self.executors = [ProcessPoolExecutor(1) for _ in range(workers)]
+            self.sent = [None] * workers  # Graph version each process holds
+            self.pending = [[] for _ in range(workers)]  # Futures each process hasn't finished
+        else:
+            self.executors = [ThreadPoolExecutor(workers)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def snapshot_of(self, graph):
+        version = getattr(graph, 'version', None)
+        if version is not None and self.snapshot is not None and self.snapshot[0] == version:
+            return self.snapshot
+        nodes, snapshot = snapshot_graph(graph, self.processes)
+        self.snapshot = (version, nodes, {node: i for i, node in enumerate(nodes)}, snapshot)
+        return self.snapshot
+
+    def submit(self, start, end, graph):
+        """
+        Starts a search in the background.
+
+        Args:
+            start: The starting node.
+            end: The goal node.
+            graph (dict): The graph to search, later edits don't reach this search.
+
+        Returns:
+            PathRequest: Poll done() each frame, then read result().
+        """
+        version, nodes, index, snapshot = self.snapshot_of(graph)
+        if not self.processes:
+            return PathRequest(self.executors[0].submit(search_snapshot, snapshot, start, end, self.method))
+
+        # Least busy process, the snapshot goes along only if it has an older one (or the graph has no version)
+        for pending in self.pending:
+            pending[:] = [future for future in pending if not future.done()]
+        worker = min(range(len(self.executors)), key=lambda i: len(self.pending[i]))
+        fresh = version is not None and self.sent[worker] == version
+        future = self.executors[worker].submit(search_in_worker, version, index[start], index[end], self.method,
+                                               None if fresh else snapshot)
+        self.sent[worker] = version
+        self.pending[worker].append(future)
+        return PathRequest(future, nodes, not fresh)
+
+    def shutdown(self, wait=True):
+        for executor in self.executors:
+            executor.shutdown(wait, cancel_futures=True)
@@ -0,0 +1,99 @@
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Workers never open a window
+
+from main import *
+from concurrent.futures import ProcessPoolExecutor
+import csv, statistics, time
+
+# ==============================
+# PARALLEL BATCH RUNNER
+# ==============================
+# Fans seeded headless episodes out over every core and writes a report.
+# Run from the Pacman folder, e.g.:
+#   python batch.py --episodes 2000 --ghost-speed 4 --csv runs.csv --json report.json
+
+DIRECTIONS = [(1, 0), (-1, 0), (0, -1), (0, 1)]  # Right, Left, Up, Down
+
+def random_input_script(seed, max_ticks, turn_every=30):
+    """Seeded random-walk input for Pacman, one direction change every turn_every ticks."""
+    rng = random.Random(seed)
+    return {tick: rng.choice(DIRECTIONS) for tick in range(0, max_ticks, turn_every)}
+
+def run_episode(config):
+    """Plays one headless episode, returns its summary. Runs inside a worker process."""
+    seed = config['seed']
+    grid_map = load_map(config['map'], use_mmap=True) if config['map'] else None
+    script = random_input_script(seed, config['ticks'], config['turn_every'])
+
+    game = Game(headless=True, seed=seed, input_script=script, grid_map=grid_map, backend=config['backend'])
+    if game.swarm is not None:
+        game.swarm.speed[:] = config['ghost_speed']
+        game.swarm.mode = config['ghost_mode']
+    for ghost in game.ghosts:
+        ghost.speed = config['ghost_speed']
+        ghost.mode = config['ghost_mode']
+    result = game.simulate(config['ticks'], config['dt'])
+
+    result['survived'] = result['lives'] > 0
+    result['cleared'] = result['pellets_left'] == 0
+    return result
+
+def run_batch(episodes, base_seed=0, workers=None, chunksize=16, **settings):
+    """Runs episodes with seeds base_seed..base_seed+episodes-1 across a process pool."""
+    configs = [dict(settings, seed=base_seed + episode) for episode in range(episodes)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_episode, configs, chunksize=chunksize))
+
+def describe(values):
+    return {"mean": statistics.fmean(values),
+            "median": statistics.median(values),
+            "stdev": statistics.pstdev(values),
+            "min": min(values),
+            "max": max(values)}
+
+def aggregate(results, settings, elapsed):
+    """Score and survival statistics over every episode."""
+    return {"settings": settings,
+            "episodes": len(results),
+            "seconds": elapsed,
+            "points": describe([result['points'] for result in results]),
+            "ticks": describe([result['ticks'] for result in results]),
+            "lives": describe([result['lives'] for result in results]),
+            "survival_rate": sum(result['survived'] for result in results) / len(results),
+            "clear_rate": sum(result['cleared'] for result in results) / len(results)}
+
+def write_csv(path, results):
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=list(results[0]))
+        writer.writeheader()
+        writer.writerows(results)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run seeded headless Pacman episodes in parallel")
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first episode")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: every core)")
+    parser.add_argument("--ticks", type=int, default=10000, help="maximum ticks per episode")
+    parser.add_argument("--dt", type=float, default=1 / FPS, help="fixed step in seconds")
+    parser.add_argument("--ghost-speed", type=float, default=5)
+    parser.add_argument("--ghost-mode", choices=["chase", "ambush", "random"], default=GHOST_MODE)
+    parser.add_argument("--backend", choices=["sprites", "soa"], default=GHOST_BACKEND, help="ghost backend")
+    parser.add_argument("--turn-every", type=int, default=30, help="ticks between Pacman's random turns")
+    parser.add_argument("--map", default=None, help="tile map (.bin or .json) to play instead of the default map")
+    parser.add_argument("--csv", default=None, help="write one row per episode here")
+    parser.add_argument("--json", default=None, help="write the aggregated report here")
+    args = parser.parse_args()
+
+    settings = {"ticks": args.ticks, "dt": args.dt, "ghost_speed": args.ghost_speed,
+                "ghost_mode": args.ghost_mode, "backend": args.backend, "turn_every": args.turn_every, "map": args.map}
+
+    start = time.perf_counter()
+    results = run_batch(args.episodes, args.seed, args.workers, **settings)
+    report = aggregate(results, settings, time.perf_counter() - start)
+
+    if args.csv:
+        write_csv(args.csv, results)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=4)
+    print(json.dumps(report, indent=4))
@@ -0,0 +1,109 @@
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Benchmarks never open a window
+
+from settings import *
+from grid import CollisionGrid
+from pellets import PelletStore
+import time
+
+# ==============================
+# MICRO-BENCHMARKS
+# ==============================
+# Run from the Pacman folder:
+#   python benchmark.py walls pellets
+
+def generate_maze(rows, cols, wall_chance=0.3, seed=0):
+    """Creates a bordered TileGrid maze with random inner walls."""
+    rng = random.Random(seed)
+    maze = tilemap.TileGrid(rows, cols)
+    for row in range(rows):
+        for col in range(cols):
+            border = row in (0, rows - 1) or col in (0, cols - 1)
+            maze.set(row, col, WALL if border or rng.random() < wall_chance else PATH)
+    return maze
+
+def open_tiles(maze):
+    return maze.tiles(PATH)
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+def bench_walls(size=100, entities=50, repeat=20):
+    """Compares the old every-wall scan against the CollisionGrid lookup."""
+    maze = generate_maze(size, size)
+    rng = random.Random(1)
+    tiles = rng.sample(open_tiles(maze), entities)
+
+    # Entities nudged half a tile so they overlap walls like a sprite moving into one
+    rects = [pygame.FRect(col * TILE_SIZE + TILE_SIZE / 2, row * TILE_SIZE, TILE_SIZE, TILE_SIZE) for row, col in tiles]
+
+    wall_list = [pygame.Rect(col * TILE_SIZE, row * TILE_SIZE, TILE_SIZE, TILE_SIZE) for row, col in maze.tiles(WALL)]
+    collision_grid = CollisionGrid(maze)
+
+    def scan():
+        return [[wall for wall in wall_list if rect.colliderect(wall)] for rect in rects]
+
+    def lookup():
+        return [[wall for wall in collision_grid.walls_overlapping(rect) if rect.colliderect(wall)] for rect in rects]
+
+    assert scan() == lookup()  # Both paths must find the same walls
+
+    scan_time = timed(scan, repeat)
+    lookup_time = timed(lookup, repeat)
+    print(f'{size}x{size} maze, {len(wall_list)} walls, {entities} entities')
+    print(f'  wall list scan : {scan_time * 1000:8.3f} ms / frame')
+    print(f'  collision grid : {lookup_time * 1000:8.3f} ms / frame ({scan_time / lookup_time:.0f}x faster)')
+
+def bench_pellets(size=100, tile_size=8, frames=300, eaten_per_frame=1):
+    """Frame time of drawing every pellet rect versus blitting the cached pellet layer."""
+    maze = generate_maze(size, size)
+    screen = pygame.Surface((size * tile_size, size * tile_size))
+    rng = random.Random(2)
+
+    def per_pellet_frames():
+        pellets = PelletStore(open_tiles(maze), tile_size)
+        order = rng.sample(list(pellets.cells), len(pellets))
+        start = time.perf_counter()
+        for frame in range(frames):
+            for _ in range(eaten_per_frame):
+                pellets.eat(order.pop())
+            screen.fill('black')
+            for pellet in pellets.rects():
+                pygame.draw.rect(screen, PEACH, pellet)
+        return (time.perf_counter() - start) / frames
+
+    def cached_layer_frames():
+        pellets = PelletStore(open_tiles(maze), tile_size)
+        order = rng.sample(list(pellets.cells), len(pellets))
+        layer = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
+        for pellet in pellets.rects():
+            pygame.draw.rect(layer, PEACH, pellet)
+        pellets.pop_dirty()
+        start = time.perf_counter()
+        for frame in range(frames):
+            for _ in range(eaten_per_frame):
+                pellets.eat(order.pop())
+            screen.fill('black')
+            for cell in pellets.pop_dirty():
+                layer.fill((0, 0, 0, 0), pellets.rect(cell))
+            screen.blit(layer, (0, 0))
+        return (time.perf_counter() - start) / frames
+
+    draw_time = per_pellet_frames()
+    layer_time = cached_layer_frames()
+    print(f'{size}x{size} maze, {len(open_tiles(maze))} pellets, {frames} frames')
+    print(f'  draw.rect per pellet : {draw_time * 1000:8.3f} ms / frame')
+    print(f'  cached pellet layer  : {layer_time * 1000:8.3f} ms / frame ({draw_time / layer_time:.1f}x faster)')
+
+BENCHMARKS = {
+    'walls': bench_walls,
+    'pellets': bench_pellets,
+}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()
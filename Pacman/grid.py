@@ -0,0 +1,183 @@
+from settings import *  # Import TILE_SIZE, GRID_MAP and the tile values
+import math  # Import math for converting pixel edges to tile indexes
+from collections import deque  # Import deque for the BFS frontier
+
+class CollisionGrid():  # Wall lookup table built once from the tile map
+    """Grid-indexed wall layer answering tile and rect queries in O(1)."""
+    def __init__(self, grid_map, tile_size=TILE_SIZE):
+        self.tile_size = tile_size  # Size of one tile in pixels
+        self.rebuild(grid_map)  # Build the occupancy grid
+
+    def rebuild(self, grid_map):  # (Re)build the occupancy grid from a TileGrid
+        self.rows = grid_map.rows  # Number of rows in the grid
+        self.cols = grid_map.cols  # Number of columns in the grid
+        self.cells = bytearray(cell == WALL for cell in grid_map.cells)  # 1 = wall, 0 = open, stored row-major
+        self.rects = {(row, col): pygame.Rect(col * self.tile_size, row * self.tile_size, self.tile_size, self.tile_size)
+                      for row, col in grid_map.tiles(WALL)}  # Wall rects keyed by (row, col), created once
+
+    def is_wall(self, row, col):  # Check if tile (row, col) is a wall
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return self.cells[row * self.cols + col] == 1
+        return False  # Nothing outside the map blocks movement
+
+    def walls_overlapping(self, rect):  # Return the wall rects overlapping a rect
+        # Only the tiles covered by the rect can collide, edges that merely touch are excluded like colliderect
+        first_col = max(math.floor(rect.left / self.tile_size), 0)
+        last_col = min(math.ceil(rect.right / self.tile_size) - 1, self.cols - 1)
+        first_row = max(math.floor(rect.top / self.tile_size), 0)
+        last_row = min(math.ceil(rect.bottom / self.tile_size) - 1, self.rows - 1)
+
+        walls = []
+        for row in range(first_row, last_row + 1):  # Row-major order, same as the old wall list
+            offset = row * self.cols
+            for col in range(first_col, last_col + 1):
+                if self.cells[offset + col]:
+                    walls.append(self.rects[(row, col)])
+        return walls
+
+    def wall_rects(self):  # Every wall rect in row-major order (used for drawing)
+        return list(self.rects.values())
+
+# Direction bits and their (dc, dr) moves, in the Up, Right, Down, Left order walkable_path used
+UP, RIGHT, DOWN, LEFT = 1, 2, 4, 8
+DIRECTION_BITS = [(UP, (0, -1)), (RIGHT, (1, 0)), (DOWN, (0, 1)), (LEFT, (-1, 0))]
+MOVES_BY_MASK = [tuple(move for bit, move in DIRECTION_BITS if mask & bit) for mask in range(16)]
+
+class NeighborTable():  # Open directions of every tile, computed once at map load
+    """Per-tile bitmask of walkable neighbours, turning ghost decisions into a table lookup."""
+    def __init__(self, grid_map):
+        self.rebuild(grid_map)
+
+    def rebuild(self, grid_map):  # Recompute every tile (map load)
+        self.grid_map = grid_map
+        self.rows = grid_map.rows  # Number of rows in the grid
+        self.cols = grid_map.cols  # Number of columns in the grid
+        self.walkable = bytearray(cell == PATH for cell in grid_map.cells)  # 1 = walkable, row-major
+        self.masks = bytearray(self.rows * self.cols)  # Open direction bits, row-major
+
+        for row in range(self.rows):
+            for col in range(self.cols):
+                self.masks[row * self.cols + col] = self.compute_mask(row, col)
+
+    def refresh(self, row, col):  # Recompute a tile and its neighbours after a map edit
+        self.walkable[row * self.cols + col] = self.grid_map.get(row, col) == PATH
+        for dr, dc in [(0, 0), (-1, 0), (0, 1), (1, 0), (0, -1)]:
+            new_row, new_col = row + dr, col + dc
+            if 0 <= new_row < self.rows and 0 <= new_col < self.cols:
+                self.masks[new_row * self.cols + new_col] = self.compute_mask(new_row, new_col)
+
+    def compute_mask(self, row, col):  # Bits of the walkable tiles around (row, col)
+        mask = 0
+        for bit, (dc, dr) in DIRECTION_BITS:
+            if self.is_walkable(row + dr, col + dc):
+                mask |= bit
+        return mask
+
+    def is_walkable(self, row, col):  # Check if tile (row, col) is inside the map and open
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return self.walkable[row * self.cols + col] == 1
+        return False
+
+    def moves(self, row, col):  # Walkable moves (dc, dr) out of (row, col)
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return MOVES_BY_MASK[self.masks[row * self.cols + col]]
+        return ()
+
+class DistanceField():  # BFS flood from a target tile shared by every ghost
+    """Tile distances to a target, recomputed only when the target changes tile."""
+    def __init__(self, neighbors):
+        self.neighbors = neighbors  # NeighborTable of the map being flooded
+        self.rows = neighbors.rows  # Number of rows in the grid
+        self.cols = neighbors.cols  # Number of columns in the grid
+        self.distances = [-1] * (self.rows * self.cols)  # -1 = unreachable, row-major
+        self.target = None  # Tile the field was flooded from
+        self.floods = 0  # Number of BFS runs, handy for profiling
+
+    def invalidate(self):  # Force a new flood on the next update (map edited)
+        self.rows = self.neighbors.rows
+        self.cols = self.neighbors.cols
+        self.target = None
+
+    def update(self, target):  # Flood from target (row, col) if it moved since last time
+        if target == self.target:
+            return False
+        self.target = target
+        self.flood(target)
+        return True
+
+    def flood(self, target):  # Breadth-first search from the target over walkable tiles
+        self.distances = [-1] * (self.rows * self.cols)
+        self.floods += 1
+        row, col = target
+        if not self.neighbors.is_walkable(row, col):
+            return  # Target off the walkable map, nothing is reachable
+
+        self.distances[row * self.cols + col] = 0
+        frontier = deque([target])
+        while frontier:
+            row, col = frontier.popleft()
+            distance = self.distances[row * self.cols + col] + 1
+            for dc, dr in self.neighbors.moves(row, col):  # Table lookup instead of tile comparisons
+                new_row, new_col = row + dr, col + dc
+                if self.distances[new_row * self.cols + new_col] == -1:
+                    self.distances[new_row * self.cols + new_col] = distance
+                    frontier.append((new_row, new_col))
+
+    def distance(self, row, col):  # Steps from (row, col) to the target, -1 if unreachable
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return self.distances[row * self.cols + col]
+        return -1
+
+    def best_moves(self, row, col, moves):  # Moves (dc, dr) from (row, col) that get closest to the target
+        best, best_distance = [], -1
+        for dc, dr in moves:
+            distance = self.distance(row + dr, col + dc)
+            if distance == -1:
+                continue
+            if best_distance == -1 or distance < best_distance:
+                best, best_distance = [(dc, dr)], distance
+            elif distance == best_distance:
+                best.append((dc, dr))
+        return best
+
+class OccupancyMap():  # Which entities stand on which tile, updated only when an entity changes tile
+    """Tile occupancy index, entities touch when they share a tile or swap tiles within one tick."""
+    def __init__(self):
+        self.tiles = {}  # (row, col) -> set of entities on that tile
+        self.where = {}  # entity -> (row, col)
+        self.arrivals = {}  # (from, to) -> entities that made that move this tick
+        self.swaps = {}  # entity -> entities it swapped tiles with this tick
+
+    def place(self, entity, cell):  # Put an entity on a tile without counting it as a move (spawns, resets)
+        self.remove(entity)
+        self.where[entity] = cell
+        self.tiles.setdefault(cell, set()).add(entity)
+
+    def remove(self, entity):
+        cell = self.where.pop(entity, None)
+        if cell is not None:
+            self.tiles[cell].discard(entity)
+            if not self.tiles[cell]:
+                del self.tiles[cell]
+
+    def move(self, entity, cell):  # Register an entity's tile, O(1) and a no-op unless the tile changed
+        old = self.where.get(entity)
+        if old == cell:
+            return False
+        self.place(entity, cell)
+        if old is not None:
+            # Anyone who went the opposite way this tick passed straight through this entity
+            for other in self.arrivals.get((cell, old), ()):
+                self.swaps.setdefault(entity, set()).add(other)
+                self.swaps.setdefault(other, set()).add(entity)
+            self.arrivals.setdefault((old, cell), set()).add(entity)
+        return True
+
+    def touching(self, entity):  # Entities sharing this entity's tile or swapped with it this tick
+        cell = self.where.get(entity)
+        sharing = self.tiles.get(cell, set()) - {entity}
+        return sharing | self.swaps.get(entity, set())
+
+    def end_tick(self):  # Forget this tick's moves
+        self.arrivals.clear()
+        self.swaps.clear()
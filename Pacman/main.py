@@ -1,59 +1,102 @@
+import os
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')  # Keep pygame's banner out of the headless JSON output
+
 from settings import *
 from sprites import *
+from grid import CollisionGrid, NeighborTable, DistanceField, OccupancyMap
+from pellets import PelletStore
+from gridpath import GridMap, GridPathfinder  # Astar/gridpath.py, put on the path by settings
+from profiler import FrameProfiler
+from replay import Replay
+import argparse
 
 class Game():
-    def __init__(self):
-        # Initialize Pygame
-        pygame.init()
+    def __init__(self, headless=False, seed=None, input_script=None, grid_map=None, backend=GHOST_BACKEND,
+                 fixed_dt=None, record=None):
+        # Headless runs skip the window, fonts and flips so the logic can be stepped as fast as possible
+        self.headless = headless
+        self.fixed_dt = fixed_dt  # Logic step used by run() instead of the clock's dt, needed for replays
+
+        # Replay Recording (seed, fixed dt and every direction change, saved when run() ends)
+        self.record_path = record
+        self.recording = None
+        if record is not None:
+            self.recording = Replay(seed, fixed_dt or 1 / FPS, backend)
+            seed = self.recording.seed
+            self.fixed_dt = self.recording.dt
+        self.grid_map = grid_map if grid_map is not None else GRID_MAP  # Maze being played
+
+        if not self.headless:
+            # Initialize Pygame
+            pygame.init()
 
-        # Set up Display
-        self.display_screen = pygame.display.set_mode((WIDTH,HEIGHT))
-        pygame.display.set_caption("Pacman")
+            # Set up Display
+            self.display_screen = pygame.display.set_mode((WIDTH,HEIGHT))
+            pygame.display.set_caption("Pacman")
 
-        # Set up Clock
-        self.clock = pygame.time.Clock()
+            # Set up Clock
+            self.clock = pygame.time.Clock()
+
+            # Frame Profiler (shown in Debug Mode)
+            self.profiler = FrameProfiler()
 
         # Running Flag
         self.running = True
         self.debug = False
 
+        # Simulation State
+        self.seed = seed
+        self.rng = random.Random(seed)  # Seeded RNG shared by the ghosts instead of the global random
+        self.tick = 0  # Logic ticks stepped so far
+        self.input_script = dict(input_script) if input_script is not None else None  # {tick: (dx, dy)}
+
         # Game Variables
         self.GAME_DATA = {"points": 0,
                           "lives" : 3} 
-        self.font = pygame.font.Font('assets/pixel.ttf', 16)
+        self.font = pygame.font.Font('assets/pixel.ttf', 16) if not self.headless else None
 
     # Sprites
         self.all_sprites = pygame.sprite.Group()
 
         # Instantiate Pacman and Ghosts
-        self.pacman = Pacman(self.all_sprites)
-        self.ghosts = [Ghosts(self.all_sprites, GHOST_COLOR[i], 5 + i + 2, 8) for i in range(2)]
+        self.occupancy = OccupancyMap()  # Tile -> entities, updated only when an entity changes tile
+        self.pacman = Pacman(self.all_sprites, occupancy=self.occupancy)
+        self.pacman.keyboard = not self.headless and self.input_script is None  # Scripted and headless runs ignore the keyboard
+        self.pacman.verbose = not self.headless  # Headless runs only print their JSON summary
+        self.neighbor_table = NeighborTable(self.grid_map)  # Open directions per tile, rebuilt only on map edits
+        self.distance_field = DistanceField(self.neighbor_table)  # Shared by every ghost, flooded from Pacman's tile
+        self.pathfinder = GridPathfinder(GridMap(self.grid_map.rows, self.grid_map.cols, self.grid_map.cells,
+                                                 blocked=(WALL,)))  # Grid A* / JPS for ambushing ghosts
+        self.swarm = None  # Struct-of-arrays ghost backend, if selected
+        if backend == 'soa':
+            from swarm import create_swarm  # NumPy is only needed for this backend
+            spawns = [GHOST_SPAWNS[i % len(GHOST_SPAWNS)] for i in range(GHOST_COUNT)]
+            self.swarm, self.ghosts = create_swarm(self.all_sprites, spawns, GHOST_COLOR, self.neighbor_table,
+                                                   distance_field=self.distance_field, rng=self.rng,
+                                                   occupancy=self.occupancy)
+        else:
+            self.ghosts = [Ghosts(self.all_sprites, GHOST_COLOR[i % len(GHOST_COLOR)], *GHOST_SPAWNS[i % len(GHOST_SPAWNS)],
+                                  self.neighbor_table, distance_field=self.distance_field, rng=self.rng,
+                                  occupancy=self.occupancy, pathfinder=self.pathfinder)
+                           for i in range(GHOST_COUNT)]
 
-        # Define walls and walkable paths from GRID_MAP
-        self.wall_objects = [pygame.Rect(col_index * TILE_SIZE, row_index * TILE_SIZE, TILE_SIZE, TILE_SIZE)
-            for row_index, row in enumerate(GRID_MAP)
-            for col_index, cell in enumerate(row) if cell == '1']
+        # Define walls and walkable paths from the grid map
+        self.collision_grid = CollisionGrid(self.grid_map)
+        self.wall_objects = self.collision_grid.wall_rects()
         
         # Define Walkable Paths
-        self.walk_path = [(int(row_index),int(col_index))
-             for row_index, row in enumerate(GRID_MAP)
-             for col_index, cell in enumerate(row) if cell == '0']
+        self.walk_path = self.grid_map.tiles(PATH)
         
         # Create Pellets
-        self.pellet_size = TILE_SIZE // 4  
-        self.pellets = [
-            pygame.Rect(
-                (path[1] * TILE_SIZE) + (TILE_SIZE - self.pellet_size) // 2,  # Center X
-                (path[0] * TILE_SIZE) + (TILE_SIZE - self.pellet_size) // 2,  # Center Y
-                self.pellet_size,  # Pellet width
-                self.pellet_size   # Pellet height
-            ) 
-            for path in self.walk_path
-        ]
+        self.pellets = PelletStore(self.walk_path)
+        self.pellet_size = self.pellets.pellet_size
                 
     # Game Functions Calls
         # Create Grid Surface
-        self.create_grid_surface()
+        if not self.headless:
+            self.create_grid_surface()
+            self.create_pellet_surface()
+            self.create_debug_surface()
 
     def handle_events(self):
         for event in pygame.event.get():
@@ -68,23 +111,14 @@ class Game():
                 if keys[pygame.K_ESCAPE] and self.debug:
                     print('EXITTED DEBUG')
                     self.debug = False
-                    for x in range(0, WIDTH, TILE_SIZE):
-                        pygame.draw.line(self.grid_surface, BLACK, (x, 0), (x, HEIGHT))
-                    for y in range(0, HEIGHT, TILE_SIZE):
-                        pygame.draw.line(self.grid_surface, BLACK, (0, y), (WIDTH, y))
+                if keys[pygame.K_F10] and self.debug:  # Export the buffered frames as a Chrome trace
+                    self.profiler.export_chrome_trace()
         # If Debug Mode
         if self.debug:
                 self.debug_mode()
-        
-        # If Game End
-        if self.GAME_DATA['lives'] <= 0:
-            txt = self.font.render('GAME OVER', True, WHITE)
-            self.display_screen.blit(txt, (WIDTH / 2, HEIGHT / 2))
-            
-            self.running = False
             
     def draw_points(self):
-        text = self.font.render(f'{str(self.GAME_DATA['points'])}',True, WHITE)
+        text = self.font.render(str(self.GAME_DATA['points']),True, WHITE)
         self.display_screen.blit(text, (20, 560))
 
         # Draw Lives
@@ -98,26 +132,60 @@ class Game():
 
         # Draw Walls on Grid Surface
         for wall in self.wall_objects:
-            pygame.draw.rect(self.grid_surface, 'blue', wall, 2)\
-    
-    def debug_mode(self):
-        # Draw Grid
+            pygame.draw.rect(self.grid_surface, 'blue', wall, 2)
+
+    def create_debug_surface(self):
+        """Pre-renders the debug grid lines on their own layer, only blitted in Debug Mode."""
+        self.debug_surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        self.debug_surface.fill((0, 0, 0, 0))  # Transparent background
+
         for x in range(0, WIDTH, TILE_SIZE):
-            pygame.draw.line(self.grid_surface, LIGHTGREY, (x, 0), (x, HEIGHT))
+            pygame.draw.line(self.debug_surface, LIGHTGREY, (x, 0), (x, HEIGHT))
         for y in range(0, HEIGHT, TILE_SIZE):
-            pygame.draw.line(self.grid_surface, LIGHTGREY, (0, y), (WIDTH, y))
-        
-        # Grid Tiles Reaarangement (TO DO) #
+            pygame.draw.line(self.debug_surface, LIGHTGREY, (0, y), (WIDTH, y))
+
+    def create_pellet_surface(self):
+        """Pre-renders every pellet onto a layer that is only erased where pellets get eaten."""
+        self.pellet_surface = pygame.Surface((WIDTH, WIDTH), pygame.SRCALPHA)
+        self.pellet_surface.fill((0, 0, 0, 0))  # Transparent background
+
+        for pellet in self.pellets.rects():
+            pygame.draw.rect(self.pellet_surface, PEACH, pellet)
+        self.pellets.pop_dirty()  # Layer is in sync with the store
+
+    def update_pellet_surface(self):
+        # Erase only the cells eaten since the last frame
+        for cell in self.pellets.pop_dirty():
+            self.pellet_surface.fill((0, 0, 0, 0), self.pellets.rect(cell))
+    
+    def edit_tile(self, row, col, cell):
+        """Changes one grid map tile and refreshes every table derived from the map."""
+        if not self.grid_map.in_bounds(row, col) or self.grid_map.get(row, col) == cell:
+            return False
 
-        #mouse_x, mouse_y = pygame.mouse.get_pos()
+        self.grid_map.set(row, col, cell)
+        self.collision_grid.rebuild(self.grid_map)
+        self.wall_objects = self.collision_grid.wall_rects()
+        self.neighbor_table.refresh(row, col)
+        self.pathfinder.refresh(row, col)
+        self.distance_field.invalidate()
+        if cell == WALL:
+            self.pellets.eat((row, col))  # Walls can't hold pellets
+        if not self.headless:
+            self.create_grid_surface()
+        return True
 
-        #mdx = round(mouse_x // TILE_SIZE)
-        #mdy = round(mouse_y // TILE_SIZE)
+    def debug_mode(self):
+        # Grid Tiles Rearrangement
+        mouse_x, mouse_y = pygame.mouse.get_pos()
+
+        mdx = round(mouse_x // TILE_SIZE)
+        mdy = round(mouse_y // TILE_SIZE)
 
-        #if pygame.mouse.get_just_pressed()[0]:
-        #  GRID_MAP[mdy][mdx] = '1'
-        #elif pygame.mouse.get_pressed()[2]:
-        #  GRID_MAP[mdy][mdx] = '0'
+        if pygame.mouse.get_just_pressed()[0]:
+            self.edit_tile(mdy, mdx, WALL)
+        elif pygame.mouse.get_pressed()[2]:
+            self.edit_tile(mdy, mdx, PATH)
         
         # Save on Key Press (e.g., Press 'S' to Save)
         #if event.type == pygame.KEYDOWN:
@@ -125,35 +193,129 @@ class Game():
         #       save_map()
     
 
+    def step(self, dt):
+        """Advances the game logic by one fixed tick, no drawing involved."""
+        # Scripted Input
+        if self.input_script is not None and self.tick in self.input_script:
+            self.pacman.direction = pygame.Vector2(self.input_script[self.tick])
+
+        # Handle Sprites
+        self.all_sprites.update(dt, self.collision_grid, self.pacman, self.ghosts, self.pellets, self.GAME_DATA)
+        if self.recording is not None and self.pacman.last_input is not None:
+            self.recording.record(self.tick, self.pacman.last_input)
+        if self.swarm is not None:
+            self.swarm.update(dt, self.pacman)  # Every ghost in one vectorized step
+
+        # Ghost Collisions (ghosts sharing or swapping Pacman's tile this tick)
+        if not self.pacman.invincible:
+            self.pacman.handle_ghost_collisions(self.ghosts, self.GAME_DATA, self.pacman.elapsed)
+        self.occupancy.end_tick()
+        self.tick += 1
+
+        # If Game End
+        if self.GAME_DATA['lives'] <= 0:
+            self.running = False
+
+    def simulate(self, max_ticks, dt=1 / FPS):
+        """Steps the game with a fixed dt until game over, all pellets eaten or max_ticks."""
+        while self.running and self.tick < max_ticks and self.pellets.remaining:
+            self.step(dt)
+        return self.summary()
+
+    @classmethod
+    def from_replay(cls, replay, headless=False):
+        """Rebuilds a recorded session, its input log drives Pacman."""
+        return cls(headless=headless, seed=replay.seed, input_script=replay.input_script(),
+                   backend=replay.backend, fixed_dt=replay.dt)
+
+    def fast_forward(self, tick):
+        """Steps the logic without rendering until the given tick (or game over)."""
+        while self.running and self.tick < tick:
+            self.step(self.fixed_dt or 1 / FPS)
+
+    def summary(self):
+        return {"seed": self.seed,
+                "points": self.GAME_DATA['points'],
+                "lives": self.GAME_DATA['lives'],
+                "ticks": self.tick,
+                "pellets_left": self.pellets.remaining}
+
     def run(self):
         while self.running:
             # Delta Time
             dt = self.clock.tick(FPS) / 1000
+            self.profiler.begin_frame()
 
             # Event Handler
-            self.handle_events()
+            with self.profiler.phase('events'):
+                self.handle_events()
                  
-            # Fill Screen
-            self.display_screen.fill('black')
+            with self.profiler.phase('background'):
+                # Fill Screen
+                self.display_screen.fill('black')
 
-            # Blit Grid (pre-rendered for performance)
-            self.display_screen.blit(self.grid_surface, (0, 0))
+                # Blit Grid (pre-rendered for performance)
+                self.display_screen.blit(self.grid_surface, (0, 0))
+                if self.debug:
+                    self.display_screen.blit(self.debug_surface, (0, 0))
 
-            # Blit Pellets
-            for pellet in self.pellets:
-                pygame.draw.rect(self.display_screen, PEACH, pellet)
-            
-            self.draw_points()
+                self.draw_points()
+
+            # Blit Pellets (single blit of the cached layer)
+            with self.profiler.phase('pellet draw'):
+                self.update_pellet_surface()
+                self.display_screen.blit(self.pellet_surface, (0, 0))
 
             # Draw and Handle Sprites
-            self.all_sprites.update(dt, self.wall_objects, self.pacman, self.ghosts, self.pellets, self.GAME_DATA)
-            self.all_sprites.draw(self.display_screen)
+            with self.profiler.phase('sprite update'):
+                self.step(self.fixed_dt or dt)
+            with self.profiler.phase('sprite draw'):
+                self.all_sprites.draw(self.display_screen)
+
+            # If Game End
+            if self.GAME_DATA['lives'] <= 0:
+                txt = self.font.render('GAME OVER', True, WHITE)
+                self.display_screen.blit(txt, (WIDTH / 2, HEIGHT / 2))
+
+            # Frame Timings (Debug Mode)
+            if self.debug:
+                with self.profiler.phase('overlay'):
+                    self.profiler.draw(self.display_screen)
 
             # Render Display
-            pygame.display.flip()
+            with self.profiler.phase('flip'):
+                pygame.display.flip()
+            self.profiler.end_frame()
+
+        # Save Replay
+        if self.recording is not None:
+            self.recording.ticks = self.tick
+            self.recording.save(self.record_path)
 
     pygame.quit()
 
 if __name__ == "__main__":
-    game = Game()
-    game.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Pacman")
+    parser.add_argument("--headless", action="store_true", help="run the fixed-step simulation without a window")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the ghost RNG")
+    parser.add_argument("--ticks", type=int, default=10000, help="maximum ticks for a headless run")
+    parser.add_argument("--backend", choices=["sprites", "soa"], default=GHOST_BACKEND, help="ghost backend")
+    parser.add_argument("--record", default=None, help="record the session's inputs to this replay file")
+    parser.add_argument("--replay", default=None, help="play back a recorded replay file")
+    parser.add_argument("--jump", type=int, default=0, help="replay tick to fast-forward to before rendering")
+    args = parser.parse_args()
+
+    if args.replay:
+        replay = Replay.load(args.replay)
+        game = Game.from_replay(replay, headless=args.headless)
+        if args.headless:
+            print(json.dumps(game.simulate(replay.ticks, replay.dt)))
+        else:
+            game.fast_forward(args.jump)
+            game.run()
+    elif args.headless:
+        game = Game(headless=True, seed=args.seed, backend=args.backend)
+        print(json.dumps(game.simulate(args.ticks)))
+    else:
+        game = Game(seed=args.seed, backend=args.backend, record=args.record)
+        game.run()
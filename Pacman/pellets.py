@@ -0,0 +1,39 @@
+from settings import *  # Import TILE_SIZE and GRID_MAP
+
+class PelletStore():  # Pellets keyed by the grid cell they sit on
+    """Hash-backed pellet store, eating is a single lookup on the eater's tile."""
+    def __init__(self, walk_path, tile_size=TILE_SIZE):
+        self.tile_size = tile_size  # Size of one tile in pixels
+        self.pellet_size = tile_size // 4  # Pellet width and height
+        self.cells = {cell: self.rect(cell) for cell in walk_path}  # (row, col) -> rect of every remaining pellet
+        self.dirty = []  # Cells changed since the renderer last looked
+
+    @property
+    def remaining(self):  # Number of pellets left on the map
+        return len(self.cells)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell):
+        return cell in self.cells
+
+    def rect(self, cell):  # Pellet rect centered in its tile
+        row, col = cell
+        offset = (self.tile_size - self.pellet_size) // 2
+        return pygame.Rect(col * self.tile_size + offset, row * self.tile_size + offset,
+                           self.pellet_size, self.pellet_size)
+
+    def rects(self):  # Rects of every remaining pellet
+        return self.cells.values()
+
+    def eat(self, cell):  # Remove the pellet on a cell, True if there was one
+        if cell in self.cells:
+            del self.cells[cell]
+            self.dirty.append(cell)
+            return True
+        return False
+
+    def pop_dirty(self):  # Hand the changed cells to the renderer and clear the list
+        dirty, self.dirty = self.dirty, []
+        return dirty
@@ -0,0 +1,95 @@
+from settings import *  # Import pygame, json and the colors
+from collections import deque  # Import deque for the frame ring buffer
+from contextlib import contextmanager  # Import contextmanager for timing phases
+import time  # Import time for the high resolution clock
+
+# Phase colors for the overlay graph, phases not listed fall back to white
+PHASE_COLORS = {
+    'events': (255, 99, 71),
+    'background': (100, 100, 100),
+    'pellet draw': PEACH,
+    'sprite update': (50, 205, 50),
+    'sprite draw': (65, 105, 225),
+    'flip': (238, 130, 238),
+    'overlay': (255, 215, 0),
+}
+
+class FrameProfiler():  # Per-phase frame timings kept in a ring buffer
+    """Times named phases of every frame, draws them as an overlay and exports Chrome traces."""
+    def __init__(self, capacity=240, budget=1 / FPS):
+        self.frames = deque(maxlen=capacity)  # Finished frames: (start, [(phase, start, duration), ...])
+        self.budget = budget  # Frame budget in seconds (16.7 ms at 60 FPS)
+        self.origin = time.perf_counter()  # Trace timestamps are relative to this
+        self.current = None  # Phases of the frame being recorded
+        self.frame_start = 0  # Start of the frame being recorded
+        self.font = None  # Created on first draw so headless runs never touch fonts
+
+    def begin_frame(self):
+        self.frame_start = time.perf_counter()
+        self.current = []
+
+    @contextmanager
+    def phase(self, name):  # with profiler.phase('flip'): ...
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.current is not None:
+                self.current.append((name, start, time.perf_counter() - start))
+
+    def end_frame(self):
+        if self.current is not None:
+            self.frames.append((self.frame_start, self.current))
+            self.current = None
+
+    def averages(self):  # Mean seconds per phase over the buffered frames
+        totals = {}
+        for frame_start, phases in self.frames:
+            for name, start, duration in phases:
+                totals[name] = totals.get(name, 0) + duration
+        return {name: total / len(self.frames) for name, total in totals.items()} if self.frames else {}
+
+    def chrome_trace(self):  # Trace Event Format, open in chrome://tracing or ui.perfetto.dev
+        events = []
+        for frame_start, phases in self.frames:
+            frame_end = max((start + duration for name, start, duration in phases), default=frame_start)
+            events.append({"name": "frame", "ph": "X", "pid": 0, "tid": 0,
+                           "ts": (frame_start - self.origin) * 1e6, "dur": (frame_end - frame_start) * 1e6})
+            for name, start, duration in phases:
+                events.append({"name": name, "ph": "X", "pid": 0, "tid": 0,
+                               "ts": (start - self.origin) * 1e6, "dur": duration * 1e6})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path="trace.json"):
+        with open(path, "w") as file:
+            json.dump(self.chrome_trace(), file)
+        print(f"Trace Saved! ({len(self.frames)} frames -> {path})")
+
+    def draw(self, surface, topleft=(8, 8), height=100):
+        """Draws a stacked bar per buffered frame, the frame budget line and a legend."""
+        if self.font is None:
+            self.font = pygame.font.Font(None, 16)
+
+        width = self.frames.maxlen
+        scale = height / (self.budget * 2)  # Graph tops out at twice the budget
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 180))
+
+        for x, (frame_start, phases) in enumerate(self.frames):
+            y = height
+            for name, start, duration in phases:
+                bar = round(duration * scale)
+                if bar:
+                    pygame.draw.line(panel, PHASE_COLORS.get(name, WHITE), (x, y), (x, y - bar))
+                    y -= bar
+                if y <= 0:
+                    break
+
+        budget_y = height - round(self.budget * scale)
+        pygame.draw.line(panel, 'red', (0, budget_y), (width, budget_y))
+        surface.blit(panel, topleft)
+
+        # Legend with the average cost of each phase
+        for row, (name, average) in enumerate(self.averages().items()):
+            text = self.font.render(f'{name}: {average * 1000:.2f} ms', True, PHASE_COLORS.get(name, WHITE))
+            surface.blit(text, (topleft[0] + width + 8, topleft[1] + row * 14))
@@ -0,0 +1,42 @@
+import json, random
+
+# ==============================
+# REPLAYS
+# ==============================
+# A replay is everything needed to rebuild a session tick for tick:
+# the ghost RNG seed, the fixed dt, the ghost backend and Pacman's
+# direction changes stamped with the tick they happened on.
+#   python main.py --record session.json
+#   python main.py --replay session.json --jump 1200
+#   python main.py --replay session.json --headless
+
+VERSION = 1
+
+class Replay():  # Compact input log of one session
+    def __init__(self, seed=None, dt=1 / 60, backend='sprites', inputs=None, ticks=0):
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)  # Always replayable
+        self.dt = dt  # Fixed step the session was simulated with
+        self.backend = backend  # Ghost backend, the swarm draws random numbers differently
+        self.inputs = inputs if inputs is not None else []  # [(tick, dx, dy), ...] in tick order
+        self.ticks = ticks  # Length of the session in ticks
+
+    def record(self, tick, direction):  # Log a direction change made on this tick
+        self.inputs.append((tick, int(direction[0]), int(direction[1])))
+
+    def input_script(self):  # {tick: (dx, dy)} as used by Game(input_script=...)
+        return {tick: (dx, dy) for tick, dx, dy in self.inputs}
+
+    def save(self, path):
+        data = {"version": VERSION, "seed": self.seed, "dt": self.dt, "backend": self.backend,
+                "ticks": self.ticks, "inputs": self.inputs}
+        with open(path, "w") as file:
+            json.dump(data, file, separators=(",", ":"))
+        print(f"Replay Saved! ({len(self.inputs)} inputs, {self.ticks} ticks -> {path})")
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r") as file:
+            data = json.load(file)
+        if data.get("version") != VERSION:
+            raise ValueError(f"Unsupported replay version {data.get('version')}")
+        return cls(data["seed"], data["dt"], data["backend"], [tuple(entry) for entry in data["inputs"]], data["ticks"])
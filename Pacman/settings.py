@@ -1,8 +1,13 @@
-               import pygame, sys, json,random
-from os.path import join
+import pygame, sys, json,random
+from os.path import join, exists, dirname, abspath
 import json
+import tilemap
+from tilemap import PATH, WALL
 import heapq
 
+# Grid A* / Jump Point Search shared with the other projects (Astar/gridpath.py)
+sys.path.append(join(dirname(abspath(__file__)), '..', 'Astar'))
+
 # Game Color (R,G,B)
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -41,15 +46,26 @@ TILE_SIZE = 32
 GRID_WIDTH = WIDTH / TILE_SIZE
 GRID_HEIGHT = WIDTH / TILE_SIZE
 
-# Load Map if Exists
+# Ghost Settings
+GHOST_COUNT = 2
+GHOST_MODE = 'chase'  # 'chase' follows the shared distance field, 'ambush' paths (JPS) to the tiles ahead of Pacman, 'random' wanders
+AMBUSH_LEAD = 4  # How many tiles ahead of Pacman an ambushing ghost aims for
+GHOST_SPAWNS = [(7, 8), (8, 8), (9, 8), (10, 8), (6, 8)]  # (x, y) tiles inside the ghost house, reused in order
+GHOST_BACKEND = 'sprites'  # 'sprites' = one Ghosts sprite each, 'soa' = NumPy struct-of-arrays swarm (needs numpy)
+
+# Load Map if Exists (binary map first, JSON as fallback)
+def load_map(path, use_mmap=False):
+    return tilemap.load(path, use_mmap)
+
 try:
-    with open(join("assets", "tilemap.json"),"r") as file:
-        GRID_MAP = json.load(file)
+    if exists(join("assets", "tilemap.bin")):
+        GRID_MAP = load_map(join("assets", "tilemap.bin"))
+    else:
+        GRID_MAP = load_map(join("assets", "tilemap.json"))
 except FileNotFoundError:
     pygame.quit('No Map Found || Check File Path')
 
 # Save Map || Debug Mode
-def save_map():
-    with open("tilemap.json", "w") as file:
-        json.dump(GRID_MAP, file, indent=4)
+def save_map(path=join("assets", "tilemap.bin")):
+    tilemap.save(GRID_MAP, path)
     print("Map Saved!")
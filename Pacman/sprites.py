@@ -3,8 +3,9 @@ import pygame  # Import Pygame for handling graphics and game logic
 import random  # Import random for ghost movement logic
 
 class Entities(pygame.sprite.Sprite):  # Base class for all game entities
-    def __init__(self, *groups):
+    def __init__(self, *groups, occupancy=None):
         super().__init__(*groups)
+        self.occupancy = occupancy  # Shared OccupancyMap, told whenever the entity changes tile
         self.image = pygame.Surface((TILE_SIZE, TILE_SIZE))  # Create a square surface for the entity
         self.image.fill('yellow')  # Set the default entity color to yellow
         self.rect = self.image.get_frect()  # Get the rectangle for positioning and collisions
@@ -12,11 +13,11 @@ class Entities(pygame.sprite.Sprite):  # Base class for all game entities
         self.direction = pygame.Vector2(0, 0)  # Direction of movement
         self.speed = 5  # Movement speed of the entity
         self.move_timer = 0  # Timer to regulate movement speed
-        self.rows = len(GRID_MAP)  # Number of rows in the grid
-        self.cols = len(GRID_MAP[0]) if self.rows > 0 else 0  # Number of columns in the grid
+        self.rows = GRID_MAP.rows  # Number of rows in the grid
+        self.cols = GRID_MAP.cols  # Number of columns in the grid
 
-    def wall_collisions(self, walls):  # Handle collisions with walls
-        for wall in walls:
+    def wall_collisions(self, walls):  # Handle collisions with walls (walls is a CollisionGrid)
+        for wall in walls.walls_overlapping(self.rect):  # Only the walls under the entity's tiles
             if self.rect.colliderect(wall):  # Check if entity collides with a wall
                 if self.direction.x > 0:  # Moving right
                     self.rect.right = wall.left  # Stop movement at the wall
@@ -40,15 +41,27 @@ class Entities(pygame.sprite.Sprite):  # Base class for all game entities
         else:  # If checking a single object
             return self.rect.colliderect(other_object.rect)
 
+    def tile(self):  # Grid cell (row, col) the entity stands on
+        return (int(self.pos.y), int(self.pos.x))
+
+    def occupy(self, teleport=False):  # Register the current tile with the occupancy map
+        if self.occupancy is not None:
+            if teleport:
+                self.occupancy.place(self, self.tile())  # Resets and spawns don't count as moves
+            else:
+                self.occupancy.move(self, self.tile())  # No-op unless the tile changed
+
     def update(self, dt, walls, pacman, ghosts, pellets, game_data):  # Update entity state each frame
         self.move_timer += dt  # Increment move timer
         self.wall_collisions(walls)  # Check for wall collisions
+        self.occupy()  # Tell the occupancy map where the entity ended up
 
 class Pacman(Entities):  # Class for Pacman player
-    def __init__(self, groups):
-        super().__init__(groups)
+    def __init__(self, groups, occupancy=None):
+        super().__init__(groups, occupancy=occupancy)
         self.pos = pygame.Vector2(1, 1)  # Set initial position
         self.rect.topleft = self.pos * TILE_SIZE  # Position Pacman on the grid
+        self.occupy(teleport=True)  # Register the spawn tile
 
         # Collision Attributes
         self.invincible = False # Invincibility flag
@@ -58,40 +71,52 @@ class Pacman(Entities):  # Class for Pacman player
         # Collision tracking
         self.last_collision_time = 0  # Track time of last collision
         self.collision_cooldown = 1  # 1 second cooldown between collisions
+        self.elapsed = 0  # Game time in seconds, summed from dt so fixed-step runs stay deterministic
+
+        self.keyboard = True  # Read the keyboard, turned off when a script drives Pacman
+        self.verbose = True  # Print game events, turned off for headless runs so stdout stays machine-readable
+        self.last_input = None  # Direction the keyboard changed to this tick, None if unchanged
 
-    def handle_ghost_collisions(self, ghosts, game_data, current_time):
+    def handle_ghost_collisions(self, ghosts, game_data, current_time):  # Called once per tick after every entity moved
         # Check if enough time has passed since last collision
         if current_time - self.last_collision_time < self.collision_cooldown:
             return False
         
-        # Precise collision check
-        for ghost in ghosts:
-            # Use a more precise collision detection
-            if self.rect.colliderect(ghost.rect):
-                # Reset Pacman position
-                self.pos = pygame.Vector2(1, 1)
-                self.rect.topleft = self.pos * TILE_SIZE
-                self.direction = pygame.Vector2(0, 0)
-                
-                # Reset Ghosts
-                for counter, reset_ghost in enumerate(ghosts):
-                    reset_ghost.pos = pygame.Vector2(6 + counter, 8)
-                    reset_ghost.direction = pygame.Vector2(0, 0)
-                    reset_ghost.path = []
-                    reset_ghost.last_move = []
-                
-                # Reduce lives and set invincibility
-                game_data['lives'] -= 1
-                self.is_invincible = True
-                self.invincibility_timer = 0
-                self.last_collision_time = current_time
-                
+        # Occupancy check: a ghost on Pacman's tile or one that swapped tiles with him this tick
+        if self.occupancy is not None:
+            touching = self.occupancy.touching(self)
+        else:
+            touching = self.collisions(list(ghosts))  # No occupancy map, test the rects instead
+        if touching:
+            # Reset Pacman position
+            self.pos = pygame.Vector2(1, 1)
+            self.rect.topleft = self.pos * TILE_SIZE
+            self.direction = pygame.Vector2(0, 0)
+            self.occupy(teleport=True)
+            
+            # Reset Ghosts
+            for reset_ghost in ghosts:
+                reset_ghost.pos = pygame.Vector2(reset_ghost.spawn)
+                reset_ghost.direction = pygame.Vector2(0, 0)
+                reset_ghost.path = []
+                reset_ghost.last_move = []
+                if self.occupancy is not None:
+                    self.occupancy.place(reset_ghost, (int(reset_ghost.spawn[1]), int(reset_ghost.spawn[0])))
+            
+            # Reduce lives and set invincibility
+            game_data['lives'] -= 1
+            self.is_invincible = True
+            self.invincibility_timer = 0
+            self.last_collision_time = current_time
+            
+            if self.verbose:
                 print('Collision Reset')
-                return True
+            return True
         
         return False
 
     def input_movement(self):  # Handle player input for movement
+        previous = pygame.Vector2(self.direction)  # Direction before this frame's input
         keys = pygame.key.get_pressed()  # Get keyboard input
         if keys[pygame.K_d]:  # Move right
             self.direction = pygame.Vector2(1, 0)
@@ -101,12 +126,10 @@ class Pacman(Entities):  # Class for Pacman player
             self.direction = pygame.Vector2(0, -1)
         elif keys[pygame.K_s]:  # Move down
             self.direction = pygame.Vector2(0, 1)
+        self.last_input = self.direction if self.direction != previous else None  # Direction change, for replays
     
     def eat_pellets(self, pellets): # Handle Player for Eating Pellets and Adding Scores
-        for row_index, pellet in enumerate(pellets):
-            if self.rect.colliderect(pellet):
-                pellets.pop(row_index)
-                return True
+        return pellets.eat((int(self.pos.y), int(self.pos.x)))  # Single lookup on Pacman's current tile
 
     def update(self, dt, walls, pacman, ghosts, pellets, game_data):  # Update Pacman each frame
         # Track Invincibility Timer
@@ -116,7 +139,8 @@ class Pacman(Entities):  # Class for Pacman player
                 self.invincible = False
                 self.invincibility_timer = 0
 
-        self.input_movement()  # Process movement input
+        if self.keyboard:
+            self.input_movement()  # Process movement input
         
         # Base Movement (1 sec per Tile)
         if self.move_timer >= 1 / self.speed:  # Check if it's time to move
@@ -128,16 +152,16 @@ class Pacman(Entities):  # Class for Pacman player
         if self.eat_pellets(pellets):
             game_data['points'] += 10
         
-        # Handle Ghost Collisions
-        current_time = pygame.time.get_ticks() / 1000
-        if not self.invincible:
-            self.handle_ghost_collisions(ghosts, game_data, current_time)
+        # Ghost Collisions are resolved by the Game once every entity has moved
+        self.elapsed += dt
 
         super().update(dt, walls, pacman, ghosts, pellets, game_data)  # Call parent update method
 
 class Ghosts(Entities):  # Class for Ghost enemies
-    def __init__(self, groups, color, pos_x, pos_y):
-        super().__init__(groups)
+    def __init__(self, groups, color, pos_x, pos_y, neighbors, distance_field=None, mode=GHOST_MODE, rng=random,
+                 occupancy=None, pathfinder=None):
+        super().__init__(groups, occupancy=occupancy)
+        self.spawn = (pos_x, pos_y)  # Tile the ghost returns to after catching Pacman
         self.pos = pygame.Vector2(pos_x, pos_y)  # Set initial position
         self.rect.topleft = self.pos * TILE_SIZE  # Position ghost on the grid
         self.image.fill(color)  # Set ghost color
@@ -145,28 +169,43 @@ class Ghosts(Entities):  # Class for Ghost enemies
         self.last_move = []  # Track previous movement
         self.direction = pygame.Vector2(0, 0)  # Initial movement direction
         self.move_timer = 0  # Timer for controlling movement speed
+        self.neighbors = neighbors  # Shared NeighborTable of the map
+        self.distance_field = distance_field  # Shared BFS field flooded from Pacman's tile
+        self.mode = mode  # 'chase', 'ambush' or 'random'
+        self.pathfinder = pathfinder  # Shared GridPathfinder of the map, used by 'ambush'
+        self.rng = rng  # Random source, a seeded random.Random for reproducible runs
+        self.occupy(teleport=True)  # Register the spawn tile
 
     def walkable_path(self):  # Find valid movement paths for the ghost
-        self.path = []  # Reset path list
         row, col = int(self.pos.y), int(self.pos.x)  # Convert position to grid indexes
-        directions = [(-1, 0), (0, 1), (1, 0), (0, -1)]  # Up, Right, Down, Left
-
-        for dr, dc in directions:
-            new_row, new_col = row + dr, col + dc  # Calculate new position
-
-            if (0 <= new_row < len(GRID_MAP) and  # Ensure within grid bounds
-                0 <= new_col < len(GRID_MAP[0]) and  
-                GRID_MAP[new_row][new_col] == '0'):  # Check if walkable
-                self.path.append((dc, dr))  # Add walkable direction
-
+        self.path = list(self.neighbors.moves(row, col))  # Precomputed Up, Right, Down, Left moves
         return self.path  # Return list of possible moves
 
+    def ambush_move(self, pacman):  # First step of the JPS path to the tile AMBUSH_LEAD tiles ahead of Pacman
+        row, col = int(self.pos.y), int(self.pos.x)  # Ghost tile
+        target = (int(pacman.pos.y + pacman.direction.y * AMBUSH_LEAD),
+                  int(pacman.pos.x + pacman.direction.x * AMBUSH_LEAD))  # Tile in front of Pacman
+        if target == (row, col) or not self.pathfinder.grid.is_open(*target):
+            return None  # Already there or aiming into a wall, chase Pacman himself
+        path = self.pathfinder.find_path((row, col), target, jps=True)  # Every tile from the ghost to the target
+        if not path:
+            return None  # Target can't be reached
+        return (path[1][1] - col, path[1][0] - row)  # (dc, dr) of the first step
+
     def update(self, dt, walls, pacman, ghost, pellets, game_data):  # Update ghost each frame
         self.walkable_path()  # Get possible movement paths
 
         if self.move_timer >= 1 / self.speed:  # Check if it's time to move
-            if self.path:  # If there are valid paths
-                next_move = random.choice(self.path)  # Choose a random move
+            ambush_move = self.ambush_move(pacman) if self.path and self.mode == 'ambush' and self.pathfinder else None
+            if ambush_move:  # Cut Pacman off along the grid path
+                self.direction = pygame.Vector2(ambush_move[0], ambush_move[1])  # Update direction
+            elif self.path and self.mode in ('chase', 'ambush') and self.distance_field:  # Step down the shared distance field
+                self.distance_field.update((int(pacman.pos.y), int(pacman.pos.x)))  # Floods only if Pacman changed tile
+                best_moves = self.distance_field.best_moves(int(self.pos.y), int(self.pos.x), self.path)
+                next_move = self.rng.choice(best_moves or self.path)  # Wander if Pacman can't be reached
+                self.direction = pygame.Vector2(next_move[0], next_move[1])  # Update direction
+            elif self.path:  # If there are valid paths
+                next_move = self.rng.choice(self.path)  # Choose a random move
                 next_pos = (self.pos.x + next_move[0], self.pos.y + next_move[1])  # Calculate next position
                 current_pos = self.pos.x, self.pos.y  # Store current position
 
@@ -175,7 +214,7 @@ class Ghosts(Entities):  # Class for Ghost enemies
                 self.last_move.append(current_pos)  # Store new position
 
                 if next_pos == self.last_move[0]:  # Prevent backtracking
-                    next_move = random.choice(self.path)
+                    next_move = self.rng.choice(self.path)
 
                 self.direction = pygame.Vector2(next_move[0], next_move[1])  # Update direction
 
@@ -183,5 +222,4 @@ class Ghosts(Entities):  # Class for Ghost enemies
             self.pos += self.direction  # Move based on updated direction
             self.rect.topleft = self.pos * TILE_SIZE  # Update position
 
-        self.collisions(pacman)  # Check for collisions with Pacman
         super().update(dt, walls, pacman, ghost, pellets, game_data)  # Call parent update method
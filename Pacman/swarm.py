@@ -0,0 +1,131 @@
+from settings import *  # Import TILE_SIZE and the ghost settings
+from grid import DIRECTION_BITS  # Direction bits and their (dc, dr) moves
+import numpy as np  # Optional dependency, only needed for the struct-of-arrays backend
+
+# Direction bits and moves as arrays, in the Up, Right, Down, Left order of the NeighborTable
+BITS = np.array([bit for bit, move in DIRECTION_BITS], dtype=np.uint8)
+MOVES = np.array([move for bit, move in DIRECTION_BITS], dtype=np.int32)  # (dc, dr) per direction
+
+class GhostSwarm():  # Struct-of-arrays ghost backend
+    """Every ghost's position, direction and move timer in NumPy arrays, advanced in one vectorized step."""
+    def __init__(self, spawns, neighbors, distance_field=None, mode=GHOST_MODE, speed=5, rng=random, occupancy=None):
+        self.count = len(spawns)  # Number of ghosts
+        self.spawn = np.array(spawns, dtype=np.int32).reshape(-1, 2)  # (x, y) spawn tile per ghost
+        self.pos = self.spawn.copy()  # (x, y) tile per ghost
+        self.last_pos = self.spawn.copy()  # Previous tile, used to avoid backtracking when wandering
+        self.direction = np.zeros((self.count, 2), dtype=np.int32)  # (dx, dy) per ghost
+        self.move_timer = np.zeros(self.count)  # Seconds since each ghost last moved
+        self.speed = np.full(self.count, speed, dtype=float)  # Tiles per second per ghost
+        self.neighbors = neighbors  # Shared NeighborTable of the map
+        self.distance_field = distance_field  # Shared BFS field flooded from Pacman's tile
+        self.mode = mode  # 'chase', 'ambush' (chases, see update) or 'random'
+        self.rng = np.random.default_rng(rng.getrandbits(64))  # Seeded from the game RNG for reproducible runs
+        self.field = None  # NumPy copy of the distance field
+        self.field_floods = -1  # Flood count the copy was taken at
+        self.occupancy = occupancy  # Shared OccupancyMap, told about every ghost that changes tile
+        self.views = []  # GhostView per ghost, filled in by create_swarm
+
+    def reset(self, index):  # Send one ghost back to its spawn tile
+        self.pos[index] = self.spawn[index]
+        self.last_pos[index] = self.spawn[index]
+        self.direction[index] = 0
+
+    def masks(self):  # Open-direction bits as a (rows, cols) view of the NeighborTable
+        return np.frombuffer(self.neighbors.masks, dtype=np.uint8).reshape(self.neighbors.rows, self.neighbors.cols)
+
+    def distances(self, pacman):  # Distance field as a (rows, cols) array, copied only after a new flood
+        self.distance_field.update((int(pacman.pos.y), int(pacman.pos.x)))  # Floods only if Pacman changed tile
+        if self.field_floods != self.distance_field.floods or self.field is None:
+            self.field = np.array(self.distance_field.distances, dtype=np.int32).reshape(self.distance_field.rows,
+                                                                                          self.distance_field.cols)
+            self.field_floods = self.distance_field.floods
+        return self.field
+
+    def update(self, dt, pacman):  # Advance every ghost in one step
+        self.move_timer += dt
+        due = np.flatnonzero(self.move_timer >= 1 / self.speed)  # Ghosts whose move timer ran out
+        if due.size == 0:
+            return
+
+        x, y = self.pos[due, 0], self.pos[due, 1]
+        is_open = (self.masks()[y, x][:, None] & BITS) != 0  # (due, 4) walkable directions
+        next_x = x[:, None] + MOVES[:, 0]  # (due, 4) tile reached by each direction
+        next_y = y[:, None] + MOVES[:, 1]
+        jitter = self.rng.random(is_open.shape)  # Random tie-breaking, always below one step
+
+        if self.mode in ('chase', 'ambush') and self.distance_field:
+            # Step down the shared distance field, unreachable or closed directions score infinitely bad
+            # (the swarm has no per-ghost searches, so ambushing ghosts chase too)
+            field = self.distances(pacman)
+            rows, cols = field.shape
+            safe_x, safe_y = np.clip(next_x, 0, cols - 1), np.clip(next_y, 0, rows - 1)
+            distance = np.where(is_open, field[safe_y, safe_x], -1)
+            score = np.where(distance >= 0, distance + jitter, np.inf)
+            lost = np.isinf(score).all(axis=1)  # Pacman unreachable, wander instead
+            score[lost] = np.where(is_open[lost], jitter[lost], np.inf)
+        else:
+            # Wander, backtracking only when it is the sole way out
+            backtrack = (next_x == self.last_pos[due, 0][:, None]) & (next_y == self.last_pos[due, 1][:, None])
+            score = np.where(is_open, jitter + backtrack, np.inf)
+
+        choice = np.argmin(score, axis=1)
+        stuck = ~is_open.any(axis=1)  # Nowhere to go, stand still
+        self.direction[due] = np.where(stuck[:, None], 0, MOVES[choice])
+
+        self.last_pos[due] = self.pos[due]
+        self.pos[due] += self.direction[due]
+        self.move_timer[due] = 0
+
+        # Only ghosts that actually changed tile touch the occupancy map
+        if self.occupancy is not None:
+            for index in due[~stuck]:
+                x, y = self.pos[index]
+                self.occupancy.move(self.views[index], (int(y), int(x)))
+
+class GhostView(pygame.sprite.Sprite):  # Sprite-like view of one swarm ghost, used for drawing and collisions
+    def __init__(self, groups, swarm, index, image):
+        super().__init__(groups)
+        self.swarm = swarm  # Arrays backing this ghost
+        self.index = index  # Row of this ghost in the arrays
+        self.image = image  # Shared surface per ghost color
+        self.spawn = tuple(int(value) for value in swarm.spawn[index])  # Tile the ghost returns to
+        self.path = []  # Kept for Pacman's collision reset
+        self.last_move = []  # Kept for Pacman's collision reset
+
+    @property
+    def pos(self):
+        return pygame.Vector2(*self.swarm.pos[self.index])
+
+    @pos.setter
+    def pos(self, value):
+        self.swarm.pos[self.index] = (int(value[0]), int(value[1]))
+        self.swarm.last_pos[self.index] = self.swarm.pos[self.index]
+
+    @property
+    def direction(self):
+        return pygame.Vector2(*self.swarm.direction[self.index])
+
+    @direction.setter
+    def direction(self, value):
+        self.swarm.direction[self.index] = (int(value[0]), int(value[1]))
+
+    @property
+    def rect(self):  # Rect rebuilt from the arrays so drawing always matches the simulation
+        x, y = self.swarm.pos[self.index]
+        return pygame.FRect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+
+    def update(self, *args):  # The swarm advances every ghost at once
+        pass
+
+def create_swarm(groups, spawns, colors, neighbors, distance_field=None, mode=GHOST_MODE, rng=random, occupancy=None):
+    """Builds a GhostSwarm and one GhostView per ghost, returns (swarm, views)."""
+    swarm = GhostSwarm(spawns, neighbors, distance_field, mode, rng=rng, occupancy=occupancy)
+    images = {}
+    for color in colors:
+        images[color] = pygame.Surface((TILE_SIZE, TILE_SIZE))
+        images[color].fill(color)
+    swarm.views = [GhostView(groups, swarm, index, images[colors[index % len(colors)]]) for index in range(swarm.count)]
+    if occupancy is not None:
+        for view in swarm.views:
+            occupancy.place(view, (view.spawn[1], view.spawn[0]))  # Register the spawn tiles
+    return swarm, swarm.views
@@ -0,0 +1,108 @@
+import json, mmap, struct
+
+# ==============================
+# BINARY TILE MAP FORMAT
+# ==============================
+# Header (little-endian, 10 bytes):
+#   4s  magic   b'PMAP'
+#   B   version 1
+#   B   bytes per tile (always 1)
+#   H   rows
+#   H   cols
+# Body: rows * cols uint8 tile values, row-major.
+# JSON (a list of rows of '0'/'1' strings) stays available for import/export.
+
+PATH = 0  # Walkable tile
+WALL = 1  # Wall tile
+
+MAGIC = b'PMAP'
+VERSION = 1
+HEADER = struct.Struct('<4sBBHH')
+
+class TileGrid():  # Typed, row-major tile map
+    """Row-major uint8 tile map shared by the collision, neighbour and pellet layers."""
+    def __init__(self, rows, cols, cells=None):
+        self.rows = rows  # Number of rows in the grid
+        self.cols = cols  # Number of columns in the grid
+        self.cells = cells if cells is not None else bytearray(rows * cols)  # bytearray or memoryview of a mapped file
+        if len(self.cells) != rows * cols:
+            raise ValueError(f'Expected {rows * cols} tiles, got {len(self.cells)}')
+
+    @classmethod
+    def from_rows(cls, rows):  # Build from GRID_MAP-style rows of '0'/'1' strings (or ints)
+        grid = cls(len(rows), len(rows[0]) if rows else 0)
+        for row_index, row in enumerate(rows):
+            for col_index, cell in enumerate(row):
+                grid.cells[row_index * grid.cols + col_index] = int(cell)
+        return grid
+
+    def to_rows(self):  # Export to GRID_MAP-style rows of strings (JSON format)
+        return [[str(self.cells[row * self.cols + col]) for col in range(self.cols)] for row in range(self.rows)]
+
+    def in_bounds(self, row, col):
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def get(self, row, col):  # Tile value at (row, col)
+        return self.cells[row * self.cols + col]
+
+    def set(self, row, col, value):
+        self.cells[row * self.cols + col] = value
+
+    def is_wall(self, row, col):
+        return self.in_bounds(row, col) and self.cells[row * self.cols + col] == WALL
+
+    def is_path(self, row, col):
+        return self.in_bounds(row, col) and self.cells[row * self.cols + col] == PATH
+
+    def tiles(self, value):  # (row, col) of every tile holding value, row-major
+        return [(index // self.cols, index % self.cols) for index, cell in enumerate(self.cells) if cell == value]
+
+    def to_bytes(self):
+        return HEADER.pack(MAGIC, VERSION, 1, self.rows, self.cols) + bytes(self.cells)
+
+def parse_header(data):
+    magic, version, tile_bytes, rows, cols = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError('Not a PMAP tile map')
+    if version != VERSION or tile_bytes != 1:
+        raise ValueError(f'Unsupported PMAP version {version} ({tile_bytes} bytes per tile)')
+    return rows, cols
+
+def load_binary(path, use_mmap=False):
+    """Loads a .bin map. With use_mmap the tiles stay in a copy-on-write memory map of the file."""
+    with open(path, 'rb') as file:
+        if use_mmap:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)  # Edits never reach the file
+            rows, cols = parse_header(mapped)
+            return TileGrid(rows, cols, memoryview(mapped)[HEADER.size:HEADER.size + rows * cols])
+        data = file.read()
+    rows, cols = parse_header(data)
+    return TileGrid(rows, cols, bytearray(data[HEADER.size:HEADER.size + rows * cols]))
+
+def save_binary(grid, path):
+    with open(path, 'wb') as file:
+        file.write(grid.to_bytes())
+
+def load_json(path):
+    with open(path, 'r') as file:
+        return TileGrid.from_rows(json.load(file))
+
+def save_json(grid, path):
+    with open(path, 'w') as file:
+        json.dump(grid.to_rows(), file, indent=4)
+
+def load(path, use_mmap=False):  # Pick the loader from the file extension
+    if path.endswith('.json'):
+        return load_json(path)
+    return load_binary(path, use_mmap)
+
+def save(grid, path):
+    if path.endswith('.json'):
+        save_json(grid, path)
+    else:
+        save_binary(grid, path)
+
+if __name__ == "__main__":
+    # Convert between formats: python tilemap.py assets/tilemap.json assets/tilemap.bin
+    import sys
+    save(load(sys.argv[1]), sys.argv[2])
@@ -62,6 +62,7 @@ class EntitySpawner(Entity):
         self.entity = 0
         self.entity_Group = entity_group
         self.max_entity = 5
+        self.path = None
 
         self.spawn_end = True
 
@@ -107,7 +108,7 @@ class EntitySpawner(Entity):
             self.image = self._get_animation_frame('close')
     
     def _generate_entity(self):
-        Entity = Slime(self.spawn_position)
+        Entity = Slime(self.spawn_position, self.path)
         self.entity_Group.add(Entity)
         self.entity += 1
     
@@ -125,7 +126,7 @@ class EntitySpawner(Entity):
         screen_surface.blit(self.image, self.rect)
 
 class Slime(Entity):
-    def __init__(self, position):
+    def __init__(self, position, path=None):
         super().__init__()
 
         self.animation_frames = {
@@ -145,6 +146,9 @@ class Slime(Entity):
         self.speed = 100
         self.health = 100
 
+        self.waypoints = [pygame.Vector2(point) for point in path] if path else []
+        self.direction = pygame.Vector2(1,0)
+
         self.is_hit = False
         self.is_alive = True
     
@@ -153,7 +157,7 @@ class Slime(Entity):
 
         if self.animation_state == 'walk':
             if int(self.animation_index) >= 2 and int(self.animation_index) <= 4:
-                self.position.x += self.speed * delta_time
+                self._handle_path_movement(delta_time)
                 self.rect.center = self.position
         elif self.animation_state == 'death':
             if int(self.animation_index) >= len(self.animation_frames[self.animation_state]) - 1:
@@ -161,6 +165,25 @@ class Slime(Entity):
         
         self._update_mask_surface()
     
+    def _handle_path_movement(self, delta_time):
+        step = self.speed * delta_time
+
+        # Walk through the waypoints, then keep going the same way off the map
+        while self.waypoints and step > 0:
+            offset = self.waypoints[0] - self.position
+            distance = offset.length()
+            if distance <= step:
+                self.position.update(self.waypoints.pop(0))
+                step -= distance
+                if distance > 0:
+                    self.direction = offset.normalize()
+            else:
+                self.direction = offset.normalize()
+                self.position += self.direction * step
+                step = 0
+
+        self.position += self.direction * step
+
     def _get_animation_frame(self, new_state=None):
         super()._get_animation_frame()
 
@@ -3,6 +3,7 @@ from archer import ArcherTower
 from enemy import Slime, EntitySpawner
 from card import Card, CardManager
 from gui import GUIManager
+from gridpath import GridMap, GridPathfinder
 
 class TowerDefense(Game, TileMapManager):
     def __init__(self):
@@ -33,6 +34,11 @@ class TowerDefense(Game, TileMapManager):
         self.TILE_IMAGES = self._handle_tile_image(os.path.join('assets', 'TileSet', '1 Tiles'))
         self.OBJECT_IMAGES = self._handle_tile_image(os.path.join('assets', 'TileSet', '2 Objects', '1 Shadow'))
 
+        # Enemy Path Properties
+        self.ROAD_TILE = 11
+        self.ENEMY_EXIT = (10, 15)
+        self.ENTITY_SPAWNER.path = self._create_enemy_path()
+
     def _handle_tile_image_draw(self):
         for row,tiles in enumerate(self.TILEMAP['tile']):
             for col,tile in enumerate(tiles):
@@ -61,6 +67,23 @@ class TowerDefense(Game, TileMapManager):
 
         return tile_images
 
+    def _create_enemy_path(self):
+        road = GridMap.from_rows(self.TILEMAP['tile'], lambda tile: tile == self.ROAD_TILE)
+        spawn_tile = (int(self.ENTITY_SPAWNER.rect.centery // self.GRID_TILESIZE),
+                      int(self.ENTITY_SPAWNER.rect.centerx // self.GRID_TILESIZE))
+
+        path = GridPathfinder(road).find_path(spawn_tile, self.ENEMY_EXIT, jps=True)
+        if path is None:
+            print(f'No road from {spawn_tile} to {self.ENEMY_EXIT}')
+            return None
+
+        # Keep only the tiles where the road turns, as pixel centers
+        waypoints = []
+        for previous, tile, following in zip(path, path[1:], path[2:] + [None]):
+            if following is None or (tile[0] - previous[0], tile[1] - previous[1]) != (following[0] - tile[0], following[1] - tile[1]):
+                waypoints.append(((tile[1] + 0.5) * self.GRID_TILESIZE, (tile[0] + 0.5) * self.GRID_TILESIZE))
+        return waypoints
+
     def _handle_game_events(self, keys):
         super()._handle_game_events()
         
@@ -1,6 +1,9 @@
-import os, pygame, math, random, json
+import os, sys, pygame, math, random, json
 from enum import Enum
 
+# Grid A* / Jump Point Search shared with the other projects (Astar/gridpath.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Astar'))
+
 class Game():
     def __init__(self):
         pygame.init()